@@ -0,0 +1,127 @@
+import os
+import socketserver
+import threading
+import time
+import django
+from datetime import timedelta
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gestion_activos.settings')
+django.setup()
+
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from core.models import Responsable, Equipo, Turno
+from notifications.models import NotificacionEncolada, HistorialEnvio, AuditLogNotificaciones
+from notifications.services import NotificationService
+
+MENSAJES = 60
+LATENCIA_SMTP = 0.2  # Segundos por mensaje, como un ida y vuelta a Gmail
+HILOS = [1, 2, 4, 8]
+PREFIJO = 'RESPONSABLE SMTP BENCH'
+
+
+class SumideroSMTP(socketserver.StreamRequestHandler):
+    """Servidor SMTP mínimo: acepta todo, descarta el contenido y demora cada mensaje."""
+
+    def responder(self, linea):
+        self.wfile.write(linea.encode() + b'\r\n')
+
+    def handle(self):
+        self.responder('220 sumidero ESMTP')
+        while True:
+            linea = self.rfile.readline()
+            if not linea:
+                return
+            comando = linea[:4].upper()
+            if comando == b'EHLO':
+                self.responder('250-sumidero')
+                self.responder('250 8BITMIME')
+            elif comando == b'DATA':
+                self.responder('354 fin con <CRLF>.<CRLF>')
+                while self.rfile.readline() not in (b'.\r\n', b''):
+                    pass
+                time.sleep(LATENCIA_SMTP)
+                self.server.recibidos += 1
+                self.responder('250 OK')
+            elif comando == b'QUIT':
+                self.responder('221 adios')
+                return
+            else:  # HELO, MAIL, RCPT, RSET, NOOP
+                self.responder('250 OK')
+
+
+class ServidorSMTP(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    recibidos = 0
+
+
+def poblar(n):
+    Responsable.objects.bulk_create(
+        [Responsable(nombre=f'{PREFIJO} {i:03d}', email=f'r{i}@example.com') for i in range(n)]
+    )
+    responsables = list(Responsable.objects.filter(nombre__startswith=PREFIJO))
+    Equipo.objects.bulk_create([Equipo(responsable=r, marca='DELL', modelo='OPTIPLEX', codigo=f'S{r.id}') for r in responsables])
+    manana = timezone.localdate() + timedelta(days=1)
+    Turno.objects.bulk_create([Turno(responsable=r, fecha=manana, hora='09:00', estado='asignado') for r in responsables])
+    NotificacionEncolada.objects.bulk_create([
+        NotificacionEncolada(turno=t, tipo='anticipado', fecha_programada=timezone.now() - timedelta(minutes=5))
+        for t in Turno.objects.filter(responsable__in=responsables)
+    ])
+
+
+def bench_envio_smtp():
+    servidor = ServidorSMTP(('127.0.0.1', 0), SumideroSMTP)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    ajustes = override_settings(
+        EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+        EMAIL_HOST='127.0.0.1', EMAIL_PORT=servidor.server_address[1],
+        EMAIL_USE_TLS=False, EMAIL_USE_SSL=False, EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='',
+        DEFAULT_FROM_EMAIL='cronograma@example.com',
+    )
+
+    print(f"BENCH: ejecutar_vigilancia, {MENSAJES} mensajes, SMTP local con {LATENCIA_SMTP * 1000:.0f} ms por mensaje")
+    # Los hilos de envío usan sus propias conexiones a la BD: los datos se confirman y se borran al final
+    poblar(MENSAJES)
+    cola = NotificacionEncolada.objects.filter(turno__responsable__nombre__startswith=PREFIJO)
+    base = None
+    try:
+        with ajustes:
+            for hilos in HILOS:
+                cola.update(estado='pendiente', intentos=0, reclamado_el=None)
+                servidor.recibidos = 0
+                inicio = time.perf_counter()
+                enviados, errores = NotificationService.ejecutar_vigilancia(specific_ids=list(cola.values_list('id', flat=True)), hilos=hilos)
+                segundos = time.perf_counter() - inicio
+                base = base or segundos
+                historial = HistorialEnvio.objects.filter(notificacion__in=cola, estado='enviado').count()
+                print(f"  - {hilos} hilo(s): {enviados} enviados, {errores} errores en {segundos:5.2f} s "
+                      f"({enviados / segundos:5.1f} msg/s, x{base / segundos:.1f}); "
+                      f"recibidos {servidor.recibidos}, historial {historial}")
+                HistorialEnvio.objects.filter(notificacion__in=cola).delete()
+                AuditLogNotificaciones.objects.filter(notificacion__in=cola).delete()
+
+            # Dos procesadores a la vez (p. ej. cron y el botón del panel) sobre la misma cola
+            cola.update(estado='pendiente', intentos=0, reclamado_el=None)
+            servidor.recibidos = 0
+            ids = list(cola.values_list('id', flat=True))
+            ejecuciones = [
+                threading.Thread(target=NotificationService.ejecutar_vigilancia, kwargs={'specific_ids': ids, 'hilos': 4})
+                for _ in range(2)
+            ]
+            for hilo in ejecuciones:
+                hilo.start()
+            for hilo in ejecuciones:
+                hilo.join()
+            historial = HistorialEnvio.objects.filter(notificacion__in=cola, estado='enviado').count()
+            print(f"  - 2 ejecuciones simultáneas x 4 hilos: recibidos {servidor.recibidos}, historial {historial} "
+                  f"({'sin duplicados' if servidor.recibidos == MENSAJES else 'DUPLICADOS'})")
+    finally:
+        Responsable.objects.filter(nombre__startswith=PREFIJO).delete()
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    bench_envio_smtp()
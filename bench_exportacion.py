@@ -0,0 +1,94 @@
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+import django
+from datetime import date, time as hora, timedelta
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gestion_activos.settings')
+django.setup()
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Responsable, Equipo, Turno
+from core.exportacion import escribir_cronograma, TAMANO_LOTE_EXPORTACION
+
+TAMANOS = [1000, 2000, 4000, 8000, 16000]
+MARCAS = ['DELL', 'HP', 'LENOVO', 'EPSON']
+MODELOS = ['OPTIPLEX 7090', 'PRODESK 400 G7', 'THINKCENTRE M70', 'L3150']
+
+
+class Descartar(Exception):
+    pass
+
+
+def poblar(n, semilla=11):
+    """n turnos asignados con 1-12 equipos cada uno (contadores incluidos)."""
+    rng = random.Random(semilla)
+    responsables = [Responsable(nombre=f'RESPONSABLE EXPORT {i:05d}') for i in range(n)]
+    cantidades = [rng.choice([1, 1, 2, 3, 5, 12]) for _ in range(n)]
+    for r, k in zip(responsables, cantidades):
+        r.num_equipos = k
+        r.num_atendidos = rng.randint(0, k)
+    Responsable.objects.bulk_create(responsables, batch_size=1000)
+    responsables = list(Responsable.objects.filter(nombre__startswith='RESPONSABLE EXPORT').order_by('nombre'))
+    equipos, turnos = [], []
+    for i, (r, k) in enumerate(zip(responsables, cantidades)):
+        equipos.extend(
+            Equipo(responsable=r, codigo=f'EXP-{i:05d}-{j:02d}', marca=rng.choice(MARCAS),
+                   modelo=rng.choice(MODELOS), atendido=j < r.num_atendidos)
+            for j in range(k)
+        )
+        turnos.append(Turno(
+            responsable=r, fecha=date(2026, 1, 5) + timedelta(days=i // 16), hora=hora(8 + (i % 8), 0),
+            estacion=1 + (i % 2), estado=rng.choice(['asignado', 'en_proceso', 'completado']),
+        ))
+    Equipo.objects.bulk_create(equipos, batch_size=1000)
+    Turno.objects.bulk_create(turnos, batch_size=1000)
+
+
+def medir(n):
+    try:
+        with transaction.atomic():
+            Turno.objects.all().delete()
+            poblar(n)
+            with tempfile.TemporaryFile() as archivo:
+                inicio = time.perf_counter()
+                with CaptureQueriesContext(connection) as consultas:
+                    filas = escribir_cronograma(archivo)
+                segundos = time.perf_counter() - inicio
+                tamano = archivo.tell()
+            # Segunda pasada solo para la memoria: tracemalloc distorsiona los tiempos
+            with tempfile.TemporaryFile() as archivo:
+                tracemalloc.start()
+                escribir_cronograma(archivo)
+                pico = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            raise Descartar((filas, segundos, pico, len(consultas), tamano))
+    except Descartar as e:
+        return e.args[0]  # Los datos sintéticos no quedan en la base
+
+
+def bench_exportacion():
+    print("BENCH: Write-only Excel export (time and peak Python memory vs. turnos)")
+    base = None
+    picos = {}
+    for n in TAMANOS:
+        filas, segundos, pico, consultas, tamano = medir(n)
+        base = base or segundos / n
+        picos[n] = pico
+        print(f"  - {filas:5d} turnos: {segundos:6.2f} s ({segundos / n * 1e6:5.0f} µs/turno, "
+              f"x{segundos / n / base:.2f}), pico {pico / 2**20:6.1f} MiB, "
+              f"{consultas} consultas, {tamano / 1024:6.0f} KiB")
+    # La memoria crece hasta llenar un bloque y desde ahí se mantiene
+    acotados = [picos[n] for n in TAMANOS if n >= TAMANO_LOTE_EXPORTACION]
+    print(f"  Pico con {TAMANO_LOTE_EXPORTACION}+ turnos (un bloque): {min(acotados) / 2**20:.1f}-"
+          f"{max(acotados) / 2**20:.1f} MiB, x{max(acotados) / min(acotados):.2f} "
+          f"para x{TAMANOS[-1] // TAMANO_LOTE_EXPORTACION} turnos")
+
+
+if __name__ == "__main__":
+    bench_exportacion()
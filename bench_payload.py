@@ -0,0 +1,94 @@
+import os
+import json
+import gzip
+import random
+import time
+import django
+from datetime import date, time as hora, timedelta
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gestion_activos.settings')
+django.setup()
+
+from django.db import transaction
+from django.test import RequestFactory
+
+from core.models import Responsable, Equipo, Turno
+from core.views import api_get_datos
+
+RESPONSABLES = 3000
+REPETICIONES = 5
+MARCAS = ['DELL', 'HP', 'LENOVO', 'EPSON', 'CISCO', 'SAMSUNG']
+MODELOS = ['OPTIPLEX 7090', 'PRODESK 400 G7', 'THINKCENTRE M70', 'L3150', 'CATALYST 2960', 'S24F350']
+DESCRIPCIONES = [
+    'COMPUTADOR DE ESCRITORIO CPU CON TECLADO Y MOUSE',
+    'MONITOR LED 24 PULGADAS',
+    'IMPRESORA MULTIFUNCION DE TINTA CONTINUA',
+    'SWITCH DE 24 PUERTOS ADMINISTRABLE',
+    'COMPUTADOR PORTATIL 14 PULGADAS',
+]
+
+
+class Descartar(Exception):
+    pass
+
+
+def poblar(n, semilla=7):
+    """Inventario sintético con textos repetidos, como en los Excel reales."""
+    rng = random.Random(semilla)
+    responsables = Responsable.objects.bulk_create(
+        [Responsable(nombre=f'RESPONSABLE BENCH {i:05d}') for i in range(n)]
+    )
+    equipos, turnos = [], []
+    for i, r in enumerate(responsables):
+        for k in range(rng.choice([1, 1, 2, 3, 5, 12])):
+            equipos.append(Equipo(
+                responsable=r, codigo=f'BENCH-{i:05d}-{k:02d}',
+                marca=rng.choice(MARCAS), modelo=rng.choice(MODELOS),
+                descripcion=rng.choice(DESCRIPCIONES), atendido=rng.random() < 0.3,
+            ))
+        turnos.append(Turno(
+            responsable=r, fecha=date(2026, 1, 5) + timedelta(days=i // 16),
+            hora=hora(8 + (i % 8), 0), estacion=1 + (i % 2), estado='asignado',
+        ))
+    Equipo.objects.bulk_create(equipos)
+    Turno.objects.bulk_create(turnos)
+    return len(equipos)
+
+
+def medir(factory, query):
+    tiempos = []
+    for _ in range(REPETICIONES):
+        request = factory.get('/api/datos/', query, HTTP_ACCEPT_ENCODING='gzip')
+        inicio = time.perf_counter()
+        response = api_get_datos(request)
+        tiempos.append(time.perf_counter() - inicio)
+    comprimido = response.content
+    plano = gzip.decompress(comprimido) if response.get('Content-Encoding') == 'gzip' else comprimido
+    inicio = time.perf_counter()
+    json.loads(plano)
+    parseo = time.perf_counter() - inicio
+    return len(plano), len(comprimido), min(tiempos), parseo
+
+
+def bench_payload():
+    print("BENCH: api_get_datos, row-of-dicts vs. columnar JSON (gzip)")
+    factory = RequestFactory()
+    try:
+        with transaction.atomic():
+            num_equipos = poblar(RESPONSABLES)
+            print(f"  - {RESPONSABLES} turnos, {num_equipos} equipos")
+            filas = medir(factory, {})
+            columnas = medir(factory, {'formato': 'columnar'})
+            for nombre, (plano, comprimido, servidor, parseo) in (('filas', filas), ('columnar', columnas)):
+                print(f"  - {nombre:9s}: {plano / 1024:8.1f} KiB, {comprimido / 1024:7.1f} KiB gzip, "
+                      f"servidor {servidor * 1000:6.1f} ms, JSON.parse {parseo * 1000:5.1f} ms")
+            print(f"  - Columnar: {columnas[0] / filas[0]:.0%} del tamaño plano, "
+                  f"{columnas[1] / filas[1]:.0%} del tamaño gzip")
+            raise Descartar
+    except Descartar:
+        pass  # Los datos sintéticos no quedan en la base
+
+
+if __name__ == "__main__":
+    bench_payload()
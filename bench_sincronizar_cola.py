@@ -0,0 +1,95 @@
+import os
+import time
+import django
+from datetime import datetime, time as hora, timedelta
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gestion_activos.settings')
+django.setup()
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.models import Responsable, Turno
+from notifications.models import ConfiguracionNotificacion, NotificacionEncolada
+from notifications.services import NotificationService
+
+TURNOS = 10000
+
+
+class Descartar(Exception):
+    pass
+
+
+def poblar(n):
+    """n turnos repartidos en los próximos 6 días, todos con email."""
+    hoy = timezone.localdate()
+    Responsable.objects.bulk_create(
+        [Responsable(nombre=f'RESPONSABLE COLA {i:05d}', email=f'r{i}@example.com') for i in range(n)],
+        batch_size=1000
+    )
+    ids = Responsable.objects.filter(nombre__startswith='RESPONSABLE COLA').order_by('nombre').values_list('id', flat=True)
+    Turno.objects.bulk_create(
+        [Turno(responsable_id=r_id, fecha=hoy + timedelta(days=2 + i % 5), hora=hora(8 + i % 8, 0), estado='asignado')
+         for i, r_id in enumerate(ids)],
+        batch_size=1000
+    )
+
+
+def sincronizar_fila_a_fila():
+    """El algoritmo anterior: get_or_create por turno y regla."""
+    config = ConfiguracionNotificacion.get_solo()
+    now = timezone.now()
+    hoy = timezone.localdate(now)
+    turnos = Turno.objects.filter(
+        fecha__gte=hoy - timedelta(days=1), fecha__lte=hoy + timedelta(days=7 + config.dias_antes + 1)
+    ).exclude(estado__in=['cancelado', 'completado']).select_related('responsable')
+    creadas = 0
+    for turno in turnos:
+        if not turno.fecha or not turno.hora or not turno.responsable.email:
+            continue
+        turno_dt = timezone.make_aware(datetime.combine(turno.fecha, turno.hora))
+        for tipo, anticipacion in (('anticipado', timedelta(days=config.dias_antes)),
+                                   ('jornada', timedelta(minutes=config.minutos_antes_jornada))):
+            _, created = NotificacionEncolada.objects.get_or_create(
+                turno=turno, tipo=tipo, defaults={'fecha_programada': turno_dt - anticipacion}
+            )
+            creadas += created
+    return creadas
+
+
+def medir(funcion):
+    consultas = []
+
+    def contar(execute, sql, params, many, context):
+        consultas.append(sql)
+        return execute(sql, params, many, context)
+
+    inicio = time.perf_counter()
+    with connection.execute_wrapper(contar):
+        creadas = funcion()
+    return creadas, time.perf_counter() - inicio, len(consultas)
+
+
+def bench_sincronizar_cola():
+    print(f"BENCH: sincronizar_cola with {TURNOS} upcoming turnos")
+    try:
+        with transaction.atomic():
+            NotificacionEncolada.objects.all().delete()
+            Turno.objects.all().delete()
+            poblar(TURNOS)
+            for nombre, funcion in (('fila a fila', sincronizar_fila_a_fila),
+                                    ('por conjuntos', NotificationService.sincronizar_cola)):
+                with transaction.atomic():
+                    vacia = medir(funcion)
+                    repetida = medir(funcion)  # Segunda pasada: todo existe ya
+                    transaction.set_rollback(True)
+                for etapa, (creadas, segundos, consultas) in (('cola vacía', vacia), ('re-sincronizar', repetida)):
+                    print(f"  - {nombre:13s} {etapa:15s}: {creadas:5d} creadas en {segundos:6.2f} s, {consultas:6d} consultas")
+            raise Descartar
+    except Descartar:
+        pass  # Los datos sintéticos no quedan en la base
+
+
+if __name__ == "__main__":
+    bench_sincronizar_cola()
@@ -0,0 +1,78 @@
+import os
+import django
+import time as time_module
+from datetime import date, datetime, time, timedelta
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gestion_activos.settings')
+django.setup()
+
+from core.models import ConfiguracionCronograma
+from core.services import generar_slots_compactos
+
+
+def generar_slots_legacy(config, feriados):
+    """
+    Implementación anterior de generar_slots (minuto a minuto, un dict por slot),
+    conservada aquí solo como referencia para el benchmark.
+    """
+    slots = []
+    fecha_actual = config.fecha_inicio
+    while fecha_actual <= config.fecha_fin:
+        es_sabado = fecha_actual.weekday() == 5
+        es_domingo = fecha_actual.weekday() == 6
+        excluir = False
+        if config.modo_exclusion == 'weekends':
+            if es_sabado or es_domingo: excluir = True
+        elif config.modo_exclusion == 'sundays':
+            if es_domingo: excluir = True
+
+        if not excluir and fecha_actual not in feriados:
+            curr_dt = datetime.combine(fecha_actual, config.hora_inicio)
+            end_dt = datetime.combine(fecha_actual, config.hora_fin)
+            lunch_start = datetime.combine(fecha_actual, config.hora_almuerzo)
+            lunch_end = lunch_start + timedelta(minutes=config.duracion_almuerzo)
+            while curr_dt + timedelta(minutes=config.duracion_turno) <= end_dt:
+                slot_end = curr_dt + timedelta(minutes=config.duracion_turno)
+                if not (curr_dt < lunch_end and slot_end > lunch_start):
+                    slots.append({'fecha': fecha_actual, 'hora': curr_dt.time()})
+                curr_dt += timedelta(minutes=config.duracion_turno)
+        fecha_actual += timedelta(days=1)
+    return slots
+
+
+def medir(func, repeticiones):
+    inicio = time_module.perf_counter()
+    for _ in range(repeticiones):
+        resultado = func()
+    return (time_module.perf_counter() - inicio) / repeticiones * 1000, resultado
+
+
+def run_benchmark():
+    feriados = {date(2026, 2, 16), date(2026, 2, 17), date(2026, 4, 3), date(2026, 5, 1)}
+    escenarios = [
+        ('1 mes, 30 min', date(2026, 1, 1), date(2026, 1, 31), 30, 'weekends'),
+        ('6 meses, 10 min', date(2026, 1, 1), date(2026, 6, 30), 10, 'weekends'),
+        ('2 años, 10 min, L-S', date(2026, 1, 1), date(2027, 12, 31), 10, 'sundays'),
+    ]
+
+    print(f"{'Escenario':<24} {'slots':>8} {'legacy (ms)':>12} {'compacto (ms)':>14} {'speedup':>8}")
+    for nombre, inicio, fin, duracion, modo in escenarios:
+        config = ConfiguracionCronograma(
+            fecha_inicio=inicio, fecha_fin=fin,
+            hora_inicio=time(8, 0), hora_fin=time(17, 0),
+            hora_almuerzo=time(12, 0), duracion_almuerzo=60,
+            duracion_turno=duracion, modo_exclusion=modo
+        )
+        t_legacy, legacy = medir(lambda: generar_slots_legacy(config, feriados), 3)
+        t_nuevo, compactos = medir(lambda: generar_slots_compactos(config, feriados), 20)
+
+        # Ambas implementaciones deben producir exactamente los mismos slots
+        assert len(legacy) == len(compactos)
+        assert all(compactos.slot(i)[:2] == (s['fecha'], s['hora']) for i, s in enumerate(legacy))
+
+        print(f"{nombre:<24} {len(compactos):>8} {t_legacy:>12.2f} {t_nuevo:>14.3f} {t_legacy / t_nuevo:>7.0f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark()
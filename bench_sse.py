@@ -0,0 +1,93 @@
+import os
+import asyncio
+import time
+import tracemalloc
+import django
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gestion_activos.settings')
+django.setup()
+
+from asgiref.sync import sync_to_async
+from django.core.asgi import get_asgi_application
+
+from core import eventos
+from core.services import registrar_cambios
+
+SUSCRIPTORES = [100, 500, 1000, 2000]
+EVENTOS = 5
+
+application = get_asgi_application()
+
+
+async def cliente(listo, recibidos, cerrar):
+    """Conexión GET /api/eventos/ directa contra la aplicación ASGI."""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': '/api/eventos/', 'raw_path': b'/api/eventos/',
+        'query_string': b'', 'root_path': '', 'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+    }
+    enviado = False
+
+    async def receive():
+        nonlocal enviado
+        if not enviado:
+            enviado = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await cerrar.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(mensaje):
+        if mensaje['type'] != 'http.response.body':
+            return
+        cuerpo = mensaje.get('body', b'')
+        if cuerpo.startswith(b'retry:'):
+            listo.release()
+        elif cuerpo.startswith(b'event: cambios'):
+            recibidos.append(time.perf_counter())
+
+    await application(scope, receive, send)
+
+
+async def medir(n):
+    listo = asyncio.Semaphore(0)
+    cerrar = asyncio.Event()
+    recibidos = []
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    tareas = [asyncio.create_task(cliente(listo, recibidos, cerrar)) for _ in range(n)]
+    for _ in range(n):
+        await listo.acquire()
+    memoria = tracemalloc.get_traced_memory()[0] - base
+
+    latencias = []
+    for _ in range(EVENTOS):
+        recibidos.clear()
+        inicio = time.perf_counter()
+        await sync_to_async(registrar_cambios)('config')
+        while len(recibidos) < n:
+            await asyncio.sleep(0.005)
+        latencias.append(max(recibidos) - inicio)
+
+    # Desconexión ordenada: Django cancela cada stream al recibir http.disconnect
+    cerrar.set()
+    await asyncio.gather(*tareas, return_exceptions=True)
+    tracemalloc.stop()
+    return memoria, latencias
+
+
+async def main():
+    print("BENCH: Concurrent SSE subscribers per process (/api/eventos/)")
+    # Intervalo corto para que la latencia medida sea la del reparto, no la del sondeo
+    eventos._difusores[asyncio.get_running_loop()] = eventos.Difusor(intervalo=0.05)
+    for n in SUSCRIPTORES:
+        memoria, latencias = await medir(n)
+        media = sum(latencias) / len(latencias) * 1000
+        print(f"  - {n:5d} clientes: {memoria / n / 1024:6.1f} KiB por conexión, "
+              f"entrega a todos en {media:7.1f} ms (peor {max(latencias) * 1000:7.1f} ms)")
+    print("  - El difusor hace una sola consulta por intervalo sin importar la cantidad de clientes.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
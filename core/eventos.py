@@ -0,0 +1,95 @@
+"""
+Canal de eventos en vivo (Server-Sent Events) del cronograma.
+
+Cada event loop del proceso ASGI tiene un único Difusor: mientras haya
+clientes conectados consulta el registro de cambios (CambioCronograma) una
+vez por intervalo y reparte el mismo delta ya serializado a la cola asyncio
+de cada cliente. La base de datos se consulta igual con 1 o con 1000 clientes.
+"""
+import asyncio
+import json
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+from .services import cambios_desde, ultimo_cambio
+
+INTERVALO_SONDEO = 1.0
+LATIDO_SEGUNDOS = 15
+# Un cliente que no consume sus eventos no acumula memoria: recibe "reiniciar"
+MAX_EVENTOS_EN_COLA = 50
+
+
+def _consultar(funcion, *args):
+    """
+    Ejecuta una consulta del sondeo como si fuera una petición: las conexiones
+    vencidas o rotas se cierran antes y después, según CONN_MAX_AGE.
+    """
+    close_old_connections()
+    try:
+        return funcion(*args)
+    finally:
+        close_old_connections()
+
+
+class Difusor:
+
+    def __init__(self, intervalo=INTERVALO_SONDEO):
+        self.intervalo = intervalo
+        self.suscriptores = set()
+        self.cursor = None
+        self.tarea = None
+        # Un solo hilo propio para las consultas: a lo sumo una conexión a la BD por difusor
+        self.ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='difusor')
+
+    def suscribir(self):
+        cola = asyncio.Queue(maxsize=MAX_EVENTOS_EN_COLA)
+        self.suscriptores.add(cola)
+        if self.tarea is None or self.tarea.done():
+            self.tarea = asyncio.get_running_loop().create_task(self._sondear())
+        return cola
+
+    def desuscribir(self, cola):
+        self.suscriptores.discard(cola)
+
+    def publicar(self, datos):
+        for cola in list(self.suscriptores):
+            try:
+                cola.put_nowait(datos)
+            except asyncio.QueueFull:
+                while not cola.empty():
+                    cola.get_nowait()
+                cola.put_nowait(json.dumps({'cursor': self.cursor, 'reiniciar': True}))
+
+    async def _en_hilo(self, funcion, *args):
+        # La tarea sobrevive a la petición que la creó: no puede usar el hilo
+        # "thread sensitive" de esa petición, que se cierra al desconectarse.
+        return await sync_to_async(_consultar, thread_sensitive=False, executor=self.ejecutor)(funcion, *args)
+
+    async def _sondear(self):
+        self.cursor = await self._en_hilo(ultimo_cambio)
+        while self.suscriptores:
+            await asyncio.sleep(self.intervalo)
+            try:
+                datos = await self._en_hilo(cambios_desde, self.cursor)
+            except Exception as e:
+                # Sigue intentando: los clientes conservan su conexión
+                print(f"Error en el difusor de eventos: {e}")
+                continue
+            if datos['cursor'] != self.cursor:
+                datos['desde'] = self.cursor
+                self.cursor = datos['cursor']
+                self.publicar(json.dumps(datos))
+
+
+_difusores = weakref.WeakKeyDictionary()
+
+
+def obtener_difusor():
+    """Difusor del event loop en curso (uno por proceso en un servidor ASGI)."""
+    loop = asyncio.get_running_loop()
+    if loop not in _difusores:
+        _difusores[loop] = Difusor()
+    return _difusores[loop]
@@ -0,0 +1,246 @@
+"""
+Exportación del cronograma a Excel.
+
+El libro se escribe con openpyxl en modo write-only: cada fila se serializa
+al archivo apenas se agrega (los textos van en línea, sin tabla de cadenas
+compartidas). Los datos salen de consultas por bloques con los equipos
+precargados, 1 consulta de resumen más 2 por bloque, y cada bloque se suelta
+antes de leer el siguiente: la memoria queda acotada por el tamaño del bloque
+(tamano_lote turnos con sus equipos) y deja de crecer a partir de ahí. Los
+formatos son estilos con nombre registrados una vez en el libro (cada celda
+guarda solo la referencia).
+
+Cada libro generado se guarda en MEDIA_ROOT/exportaciones con la versión de
+los datos (VersionDatos) en el nombre y se sirve tal cual hasta que la
+versión cambie. Tras cada cambio se regenera en segundo plano.
+"""
+import gc
+import os
+import threading
+import time
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Q, prefetch_related_objects
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+
+from .models import Turno, VersionDatos
+
+ESTADOS_EXPORTADOS = ['asignado', 'en_proceso', 'completado']
+TAMANO_LOTE_EXPORTACION = 2000
+CONTENT_TYPE_XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+CARPETA_EXPORTACIONES = 'exportaciones'
+# Segundos sin cambios antes de regenerar: una ráfaga de clics produce un solo libro
+ESPERA_REGENERACION = 5
+
+ENCABEZADOS = ['FECHA', 'HORA', 'ESTACIÓN', 'RESPONSABLE', 'EQUIPOS', 'ESTADO', 'DETALLE TÉCNICO (MARCA, MODELO, ID)']
+ANCHOS = {'A': 13, 'B': 8, 'C': 10, 'D': 30, 'E': 10, 'F': 15, 'G': 85}
+
+
+def _relleno(color):
+    return PatternFill(start_color=color, end_color=color, fill_type='solid')
+
+
+def _estilos():
+    borde = Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin'))
+    centro = Alignment(horizontal='center', vertical='center')
+    izquierda = Alignment(horizontal='left', vertical='center')
+    return [
+        NamedStyle('titulo', font=Font(bold=True, size=14, color='1F4E78'), alignment=centro),
+        NamedStyle('seccion', font=Font(bold=True, size=10, underline='single')),
+        NamedStyle('resumen_listo', font=Font(color='006100', bold=True)),
+        NamedStyle('resumen_pendiente', font=Font(color='9C0006', bold=True)),
+        NamedStyle('encabezado', font=Font(color='FFFFFF', bold=True, size=11), fill=_relleno('1F4E78'),
+                   alignment=centro, border=borde),
+        NamedStyle('fecha', number_format='DD/MM/YYYY', alignment=centro, border=borde),
+        NamedStyle('centro', alignment=centro, border=borde),
+        NamedStyle('izquierda', alignment=izquierda, border=borde),
+        NamedStyle('detalle', font=Font(size=8), alignment=izquierda, border=borde),
+        NamedStyle('estado_listo', font=Font(color='006100', bold=True), fill=_relleno('C6EFCE'),
+                   alignment=centro, border=borde),
+        NamedStyle('estado_en_proceso', font=Font(color='9C5700', bold=True), fill=_relleno('FFD966'),
+                   alignment=centro, border=borde),
+        NamedStyle('estado_pendiente', font=Font(color='0070C0', bold=True), fill=_relleno('DDEBF7'),
+                   alignment=centro, border=borde),
+    ]
+
+
+def nombre_archivo():
+    return f'Cronograma_Mantenimiento_{datetime.now().strftime("%Y%m%d")}.xlsx'
+
+
+def turnos_exportados():
+    return Turno.objects.filter(estado__in=ESTADOS_EXPORTADOS)
+
+
+def _estado(turno):
+    """Texto y estilo de la columna ESTADO."""
+    atendidos, total = turno.responsable.num_atendidos, turno.responsable.num_equipos
+    if turno.estado == 'completado':
+        return 'LISTO', 'estado_listo'
+    if turno.estado == 'en_proceso' or 0 < atendidos < total:
+        return 'EN PROCESO', 'estado_en_proceso'
+    return 'PENDIENTE', 'estado_pendiente'
+
+
+def _detalle(equipos):
+    return ' | '.join(
+        f"{'[LISTO]' if eq.atendido else '[PENDIENTE]'} {eq.marca} {eq.modelo} "
+        f"{f'({eq.codigo})' if eq.codigo else '(S/N)'}"
+        for eq in equipos
+    )
+
+
+def _turnos_por_bloques(turnos, tamano_lote):
+    """
+    Turnos con su responsable y equipos, leídos y precargados de a
+    `tamano_lote`. A diferencia de iterator() con prefetch_related, que
+    retiene el bloque anterior mientras arma el siguiente, cada turno se
+    suelta al entregarlo: en memoria hay a lo sumo un bloque.
+    """
+    filas = turnos.select_related('responsable').iterator(chunk_size=tamano_lote)
+    while bloque := list(islice(filas, tamano_lote)):
+        prefetch_related_objects(bloque, 'responsable__equipos')
+        bloque.reverse()
+        while bloque:
+            yield bloque.pop()
+        # Turno, responsable y equipos se referencian entre sí: sin recolectar
+        # los ciclos, el bloque anterior sigue vivo mientras se lee el siguiente
+        gc.collect()
+
+
+def escribir_cronograma(destino, tamano_lote=TAMANO_LOTE_EXPORTACION):
+    """
+    Escribe el cronograma (turnos asignados, en proceso y completados) en
+    `destino`, una ruta o un archivo binario abierto. Devuelve cuántos
+    turnos se exportaron.
+    """
+    wb = Workbook(write_only=True)
+    for estilo in _estilos():
+        wb.add_named_style(estilo)
+    ws = wb.create_sheet('Cronograma de Mantenimiento')
+    # En modo write-only los anchos y las celdas combinadas se fijan antes de escribir filas
+    for columna, ancho in ANCHOS.items():
+        ws.column_dimensions[columna].width = ancho
+    ws.merged_cells.add('A1:G1')
+
+    def celda(valor, estilo=None):
+        c = WriteOnlyCell(ws, value=valor)
+        if estilo:
+            c.style = estilo
+        return c
+
+    turnos = turnos_exportados()
+    resumen = turnos.aggregate(total=Count('id'), completados=Count('id', filter=Q(estado='completado')))
+    total, completados = resumen['total'], resumen['completados']
+
+    # Encabezado y resumen ejecutivo
+    ws.append([celda('SISTEMA TECHSCHEDULER - CRONOGRAMA DE MANTENIMIENTO PREVENTIVO', 'titulo')])
+    ws.append([])
+    ws.append([celda('RESUMEN DE EJECUCIÓN', 'seccion')])
+    ws.append(['Total Responsables:', total, None, 'Fecha Reporte:', datetime.now().strftime('%d/%m/%Y %H:%M')])
+    ws.append(['Mantenimientos Listos:', celda(completados, 'resumen_listo')])
+    ws.append(['Mantenimientos Pendientes:', celda(total - completados, 'resumen_pendiente')])
+    ws.append([])
+    ws.append([celda(h, 'encabezado') for h in ENCABEZADOS])
+
+    # Tabla de datos: los equipos se precargan por bloque de turnos
+    for t in _turnos_por_bloques(turnos, tamano_lote):
+        estado, estilo_estado = _estado(t)
+        ws.append([
+            celda(t.fecha, 'fecha'),
+            celda(t.hora.strftime('%H:%M') if t.hora else '--:--', 'centro'),
+            celda(t.estacion, 'centro'),
+            celda(t.responsable.nombre, 'izquierda'),
+            celda(f'{t.responsable.num_atendidos}/{t.responsable.num_equipos}', 'centro'),
+            celda(estado, estilo_estado),
+            celda(_detalle(t.responsable.equipos.all()), 'detalle'),
+        ])
+
+    wb.save(destino)
+    return total
+
+
+_bloqueo_archivos = threading.Lock()
+_bloqueo_hilo = threading.Lock()
+_regeneracion = {'hilo': None, 'ultima_solicitud': 0.0}
+
+
+def _carpeta():
+    carpeta = Path(settings.MEDIA_ROOT) / CARPETA_EXPORTACIONES
+    carpeta.mkdir(parents=True, exist_ok=True)
+    return carpeta
+
+
+def ruta_exportacion(version):
+    return _carpeta() / f'cronograma_v{version}.xlsx'
+
+
+def generar_exportacion(version):
+    """
+    Devuelve el libro guardado de `version`, generándolo si todavía no existe.
+    La versión debe leerse antes que los datos: si algo cambia mientras se
+    escribe, el archivo queda con datos más nuevos que su versión y nunca al revés.
+    """
+    destino = ruta_exportacion(version)
+    with _bloqueo_archivos:
+        if destino.exists():
+            return destino
+        temporal = destino.with_name(f'{destino.name}.{os.getpid()}.tmp')
+        escribir_cronograma(temporal)
+        # El reemplazo es atómico: otro proceso nunca ve un libro a medio escribir
+        os.replace(temporal, destino)
+        for anterior in _carpeta().glob('cronograma_v*.xlsx'):
+            # Solo versiones más viejas: una generación atrasada no borra la vigente
+            if int(anterior.stem.rpartition('_v')[2]) < version:
+                try:
+                    anterior.unlink()
+                except OSError:
+                    pass  # Puede estar enviándose; se borrará en la próxima regeneración
+    return destino
+
+
+def programar_regeneracion():
+    """
+    Pide regenerar el libro tras un cambio. Un único hilo por proceso espera
+    ESPERA_REGENERACION segundos sin nuevos cambios y genera la versión vigente.
+    """
+    with _bloqueo_hilo:
+        _regeneracion['ultima_solicitud'] = time.monotonic()
+        hilo = _regeneracion['hilo']
+        if hilo is not None and hilo.is_alive():
+            return
+        hilo = threading.Thread(target=_regenerar_en_segundo_plano, name='exportacion', daemon=True)
+        _regeneracion['hilo'] = hilo
+        hilo.start()
+
+
+def _regenerar_en_segundo_plano():
+    try:
+        while True:
+            with _bloqueo_hilo:
+                restante = _regeneracion['ultima_solicitud'] + ESPERA_REGENERACION - time.monotonic()
+            if restante > 0:
+                time.sleep(restante)
+                continue
+
+            inicio = time.monotonic()
+            try:
+                generar_exportacion(VersionDatos.get_solo().version)
+            except Exception as e:
+                # La descarga generará el libro si hace falta
+                print(f"Error regenerando la exportación: {e}")
+
+            with _bloqueo_hilo:
+                # Si hubo cambios durante la generación, se vuelve a esperar
+                if _regeneracion['ultima_solicitud'] <= inicio:
+                    _regeneracion['hilo'] = None
+                    return
+    finally:
+        connection.close()
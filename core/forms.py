@@ -1,7 +1,13 @@
 from django import forms
 
 class UploadFileForm(forms.Form):
+    MODO_CHOICES = [
+        ('reemplazar', 'Reemplazar todo'),
+        ('incremental', 'Actualizar (conserva turnos asignados)'),
+    ]
+
     archivo = forms.FileField(
         label='Archivo Excel de Activos',
         help_text='Sube el archivo .xlsx con las columnas requeridas.'
     )
+    modo = forms.ChoiceField(choices=MODO_CHOICES, required=False, initial='reemplazar')
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, Q
+from core.models import Responsable
+from core.services import recalcular_contadores
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los contadores de equipos (num_equipos, num_atendidos) de cada responsable'
+
+    def handle(self, *args, **options):
+        desfasados = Responsable.objects.annotate(
+            real_equipos=Count('equipos'),
+            real_atendidos=Count('equipos', filter=Q(equipos__atendido=True)),
+        ).exclude(num_equipos=F('real_equipos'), num_atendidos=F('real_atendidos')).count()
+
+        actualizados = recalcular_contadores()
+        self.stdout.write(self.style.SUCCESS(
+            f"Contadores recalculados para {actualizados} responsables ({desfasados} estaban desfasados)."
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from notifications.services import NotificationService
+
+
+class Command(BaseCommand):
+    help = 'Devuelve a la cola las notificaciones con reclamos vencidos (trabajadores que murieron a mitad del envío)'
+
+    def handle(self, *args, **options):
+        resultado = NotificationService.recuperar_reclamos_vencidos()
+        if not any(resultado.values()):
+            self.stdout.write(self.style.SUCCESS("No hay reclamos vencidos. La cola está al día."))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Reclamos recuperados. Reencolados: {resultado['reencolados']}, "
+            f"enviados (según historial): {resultado['enviados']}, fallidos: {resultado['fallidos']}"
+        ))
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_trabajoimportacion'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='turno',
+            options={'ordering': ['fecha', 'hora', 'estacion']},
+        ),
+        migrations.AddField(
+            model_name='configuracioncronograma',
+            name='estaciones',
+            field=models.PositiveIntegerField(default=1, verbose_name='Estaciones de trabajo'),
+        ),
+        migrations.AddField(
+            model_name='turno',
+            name='estacion',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
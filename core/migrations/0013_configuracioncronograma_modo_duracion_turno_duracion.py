@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_estaciones'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='configuracioncronograma',
+            name='modo_duracion',
+            field=models.CharField(choices=[('fijo', 'Duración fija'), ('por_equipo', 'Según cantidad de equipos')], default='fijo', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='turno',
+            name='duracion',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Duración (min)'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.1 on 2026-10-18 14:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_versiondatos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CambioCronograma',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(choices=[('turno', 'Turno'), ('equipo', 'Equipo'), ('feriado', 'Feriado'), ('config', 'Configuración'), ('reset', 'Reinicio')], max_length=10)),
+                ('objeto_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('accion', models.CharField(choices=[('upsert', 'Creado o modificado'), ('delete', 'Eliminado')], default='upsert', max_length=10)),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Cambio de Cronograma',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 6.0.1 on 2026-10-18 04:06
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def calcular_contadores(apps, schema_editor):
+    Responsable = apps.get_model('core', 'Responsable')
+    Equipo = apps.get_model('core', 'Equipo')
+    equipos = Equipo.objects.filter(responsable=OuterRef('pk')).order_by().values('responsable')
+    Responsable.objects.update(
+        num_equipos=Coalesce(Subquery(equipos.annotate(n=Count('id')).values('n')), 0),
+        num_atendidos=Coalesce(Subquery(equipos.filter(atendido=True).annotate(n=Count('id')).values('n')), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_cambiocronograma'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='responsable',
+            name='num_atendidos',
+            field=models.PositiveIntegerField(default=0, verbose_name='Equipos atendidos'),
+        ),
+        migrations.AddField(
+            model_name='responsable',
+            name='num_equipos',
+            field=models.PositiveIntegerField(default=0, verbose_name='Equipos'),
+        ),
+        migrations.RunPython(calcular_contadores, migrations.RunPython.noop),
+    ]
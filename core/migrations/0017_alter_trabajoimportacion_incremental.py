@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 04:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_responsable_num_atendidos_responsable_num_equipos'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='trabajoimportacion',
+            name='incremental',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -1,9 +1,14 @@
 from django.db import models
+from django.db.models import F
+from django.utils import timezone
 from datetime import datetime, timedelta
 
 class Responsable(models.Model):
     nombre = models.CharField(max_length=255, unique=True, verbose_name="Responsable")
     email = models.EmailField(max_length=255, blank=True, null=True, verbose_name="Correo Electrónico")
+    # Contadores de progreso mantenidos al cambiar los equipos (ver recalcular_contadores)
+    num_equipos = models.PositiveIntegerField(default=0, verbose_name="Equipos")
+    num_atendidos = models.PositiveIntegerField(default=0, verbose_name="Equipos atendidos")
 
     def __str__(self):
         return self.nombre
@@ -34,6 +39,13 @@ class ConfiguracionCronograma(models.Model):
         ('weekends', 'Sábados y Domingos'),
     ]
     modo_exclusion = models.CharField(max_length=20, choices=MODO_EXCLUSION_CHOICES, default='weekends')
+    estaciones = models.PositiveIntegerField(default=1, verbose_name="Estaciones de trabajo")
+
+    MODO_DURACION_CHOICES = [
+        ('fijo', 'Duración fija'),
+        ('por_equipo', 'Según cantidad de equipos'),
+    ]
+    modo_duracion = models.CharField(max_length=20, choices=MODO_DURACION_CHOICES, default='fijo')
 
     class Meta:
         verbose_name = "Configuración de Cronograma"
@@ -57,6 +69,8 @@ class Turno(models.Model):
     responsable = models.OneToOneField(Responsable, on_delete=models.CASCADE, related_name='turno')
     fecha = models.DateField(null=True, blank=True)
     hora = models.TimeField(null=True, blank=True)
+    estacion = models.PositiveIntegerField(default=1)
+    duracion = models.PositiveIntegerField(null=True, blank=True, verbose_name="Duración (min)")
     estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='pendiente')
     notificar_el = models.DateTimeField(null=True, blank=True)
     notificacion_enviada = models.BooleanField(default=False)
@@ -69,7 +83,101 @@ class Turno(models.Model):
         super().save(*args, **kwargs)
 
     class Meta:
-        ordering = ['fecha', 'hora']
+        ordering = ['fecha', 'hora', 'estacion']
 
     def __str__(self):
         return f"Turno {self.responsable}: {self.fecha} {self.hora} ({self.estado})"
+
+class TrabajoImportacion(models.Model):
+    """
+    Importación de inventario ejecutada en segundo plano.
+    Guarda el progreso para que el frontend pueda consultarlo mientras se procesa.
+    """
+    ESTADO_CHOICES = [
+        ('pendiente', 'Pendiente'),
+        ('procesando', 'Procesando'),
+        ('completado', 'Completado'),
+        ('error', 'Error'),
+    ]
+
+    archivo = models.FileField(upload_to='importaciones/', blank=True)
+    nombre_original = models.CharField(max_length=255, blank=True)
+    incremental = models.BooleanField(default=False)
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='pendiente')
+
+    filas_totales = models.PositiveIntegerField(null=True, blank=True)
+    filas_procesadas = models.PositiveIntegerField(default=0)
+    filas_por_segundo = models.FloatField(default=0)
+    errores = models.TextField(blank=True)
+    resultado = models.JSONField(null=True, blank=True)
+
+    creado = models.DateTimeField(auto_now_add=True)
+    iniciado = models.DateTimeField(null=True, blank=True)
+    finalizado = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-creado']
+        verbose_name = "Trabajo de Importación"
+        verbose_name_plural = "Trabajos de Importación"
+
+    def __str__(self):
+        return f"Importación {self.nombre_original} ({self.estado})"
+
+
+class VersionDatos(models.Model):
+    """
+    Versión global de los datos que muestra el calendario (turnos, equipos,
+    feriados y configuración). Cada punto que los modifica llama a
+    incrementar() explícitamente, también en las operaciones masivas
+    (bulk_update, update, delete) que no disparan señales.
+    """
+    version = models.PositiveBigIntegerField(default=0)
+    actualizado = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Versión de Datos"
+
+    @classmethod
+    def get_solo(cls):
+        obj, created = cls.objects.get_or_create(pk=1)
+        return obj
+
+    @classmethod
+    def incrementar(cls):
+        if not cls.objects.filter(pk=1).update(version=F('version') + 1, actualizado=timezone.now()):
+            cls.objects.get_or_create(pk=1, defaults={'version': 1})
+
+    def __str__(self):
+        return f"Versión {self.version}"
+
+
+class CambioCronograma(models.Model):
+    """
+    Registro de cambios para la sincronización incremental del calendario.
+    El id sirve de cursor: cada cliente pide los cambios posteriores al último
+    que vio. Una entrada 'reset' (importación completa, reinicio del sistema)
+    obliga a recargar todo, y los cambios anteriores a ella se descartan.
+    """
+    MODELO_CHOICES = [
+        ('turno', 'Turno'),
+        ('equipo', 'Equipo'),
+        ('feriado', 'Feriado'),
+        ('config', 'Configuración'),
+        ('reset', 'Reinicio'),
+    ]
+    ACCION_CHOICES = [
+        ('upsert', 'Creado o modificado'),
+        ('delete', 'Eliminado'),
+    ]
+
+    modelo = models.CharField(max_length=10, choices=MODELO_CHOICES)
+    objeto_id = models.PositiveBigIntegerField(null=True, blank=True)
+    accion = models.CharField(max_length=10, choices=ACCION_CHOICES, default='upsert')
+    creado = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = "Cambio de Cronograma"
+
+    def __str__(self):
+        return f"#{self.id} {self.accion} {self.modelo} {self.objeto_id or ''}"
@@ -1,111 +1,1370 @@
+import heapq
+import threading
+import time as time_module
+import traceback
+import numpy as np
 import pandas as pd
+from bisect import bisect_left, insort
+from contextlib import contextmanager
+from itertools import islice
+from openpyxl import load_workbook
 from datetime import datetime, timedelta, time
-from django.db import transaction
-from .models import Responsable, Equipo, Turno, Feriado, ConfiguracionCronograma
+from django.core.cache import cache, caches
+from django.db import connection, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .models import Responsable, Equipo, Turno, Feriado, ConfiguracionCronograma, TrabajoImportacion, VersionDatos, CambioCronograma
+from .exportacion import programar_regeneracion
 
-def procesar_archivo_activos(archivo):
+# Filas que se escriben por cada INSERT masivo durante la importación.
+TAMANO_LOTE_IMPORTACION = 1000
+
+# Valores que pandas/Excel producen para celdas vacías y que no deben guardarse.
+VALORES_VACIOS = ['', 'nan', 'nat', 'none']
+
+
+def _columna_texto(df, *columnas):
     """
-    Procesa el archivo Excel cargado, crea Responsables y Equipos.
-    Limpia los datos existentes para evitar duplicados.
+    Devuelve la primera columna disponible de `columnas` como texto limpio.
+    Si hay varias, las siguientes rellenan los huecos de las anteriores
+    (ej. CODIGO_INTERNO > CPDOGP_GOBIERNO). Las celdas vacías quedan en None.
     """
-    df = pd.read_excel(archivo)
+    resultado = pd.Series(pd.NA, index=df.index, dtype='string')
+    for nombre in columnas:
+        if nombre not in df.columns:
+            continue
+        serie = df[nombre]
+        # Códigos numéricos leídos como float (123.0) se guardan como enteros
+        if pd.api.types.is_float_dtype(serie) and (serie.dropna() % 1 == 0).all():
+            serie = serie.astype('Int64')
+        texto = serie.astype('string').str.strip()
+        texto = texto.mask(texto.str.lower().isin(VALORES_VACIOS))
+        resultado = resultado.fillna(texto)
+    return resultado.astype(object).where(resultado.notna(), None)
 
+
+def normalizar_activos(df):
+    """
+    Normaliza un DataFrame crudo del Excel de activos a las columnas
+    responsable, email, codigo, marca, modelo, descripcion.
+    Descarta las filas sin responsable.
+    """
     # Normalizar nombres de columnas (MAYÚSCULAS y cambiar espacios por _)
     df.columns = [str(c).strip().upper().replace(' ', '_') for c in df.columns]
-    
+
     # Columnas esperadas: RESPONSABLE, CPDOGP_GOBIERNO, MARCA, MODELO, DESCRIPCION
+    activos = pd.DataFrame({
+        'responsable': _columna_texto(df, 'RESPONSABLE'),
+        'email': _columna_texto(df, 'EMAIL'),
+        # Prioridad: CODIGO INTERNO > CPDOGP GOBIERNO
+        'codigo': _columna_texto(df, 'CODIGO_INTERNO', 'CPDOGP_GOBIERNO'),
+        'marca': _columna_texto(df, 'MARCA'),
+        'modelo': _columna_texto(df, 'MODELO'),
+        'descripcion': _columna_texto(df, 'DESCRIPCIÓN', 'DESCRIPCION'),
+    })
+    return activos[activos['responsable'].notna()]
+
+
+# Se registran sin objeto_id (o descartan el historial, en el caso de 'reset')
+MODELOS_SIN_ID = ('feriado', 'config', 'reset')
+
+
+def registrar_cambios(modelo, ids=(), accion='upsert'):
+    """
+    Anota cambios en CambioCronograma y sube la versión de los datos.
+    Feriados y configuración se registran sin id: el cliente recibe la
+    lista o la configuración completa. 'reset' descarta el historial previo.
+    La versión se sube antes de insertar: el bloqueo de la fila de VersionDatos
+    serializa a los escritores hasta su commit, así que los ids del registro
+    quedan en orden de confirmación y sirven de cursor sin saltarse cambios.
+    Turnos y equipos sin ids no registran nada.
+    """
+    if modelo not in MODELOS_SIN_ID:
+        ids = list(ids)
+        if not ids:
+            return
+    VersionDatos.incrementar()
+    if modelo == 'reset':
+        reset = CambioCronograma.objects.create(modelo='reset')
+        CambioCronograma.objects.filter(id__lt=reset.id).delete()
+    elif modelo in MODELOS_SIN_ID:
+        CambioCronograma.objects.create(modelo=modelo, accion=accion)
+    else:
+        CambioCronograma.objects.bulk_create(
+            [CambioCronograma(modelo=modelo, objeto_id=i, accion=accion) for i in ids],
+            batch_size=TAMANO_LOTE_IMPORTACION
+        )
+    # El Excel guardado quedó viejo: se regenera cuando el cambio esté confirmado
+    transaction.on_commit(programar_regeneracion)
+
+
+def ultimo_cambio():
+    """Cursor actual del registro de cambios (0 si está vacío)."""
+    return CambioCronograma.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def serializar_equipo(e):
+    return {
+        'id': e.id,
+        'marca': e.marca,
+        'modelo': e.modelo,
+        'codigo': e.codigo,
+        'descripcion': e.descripcion,
+        'atendido': e.atendido
+    }
+
+
+def serializar_turno(t):
+    """Turno con sus equipos (requiere select_related/prefetch_related del responsable)."""
+    return {
+        'id': t.id,
+        'responsable': t.responsable.nombre,
+        'fecha': t.fecha.strftime('%Y-%m-%d') if t.fecha else '',
+        'hora': t.hora.strftime('%H:%M') if t.hora else '',
+        'estacion': t.estacion,
+        'duracion': t.duracion,
+        'estado': t.estado,
+        'equipos': [serializar_equipo(e) for e in t.responsable.equipos.all()]
+    }
+
+
+CAMPOS_DICCIONARIO = ('marca', 'modelo', 'descripcion')
+
+
+def columnas_turnos(turnos):
+    """
+    Los mismos datos que [serializar_turno(t) for t in turnos] en formato
+    columnar: un arreglo por campo en vez de un objeto por fila. Los equipos
+    van en columnas aparte, en el orden de sus turnos (num_equipos indica
+    cuántos toma cada turno), y marca/modelo/descripcion se envían como
+    índices a un diccionario de valores distintos.
+    """
+    columnas_t = {c: [] for c in ('id', 'responsable', 'fecha', 'hora', 'estacion', 'duracion', 'estado', 'num_equipos')}
+    columnas_e = {c: [] for c in ('id', 'codigo', 'atendido') + CAMPOS_DICCIONARIO}
+    indices = {c: {} for c in CAMPOS_DICCIONARIO}
+
+    for t in turnos:
+        equipos = t.responsable.equipos.all()
+        columnas_t['id'].append(t.id)
+        columnas_t['responsable'].append(t.responsable.nombre)
+        columnas_t['fecha'].append(t.fecha.strftime('%Y-%m-%d') if t.fecha else '')
+        columnas_t['hora'].append(t.hora.strftime('%H:%M') if t.hora else '')
+        columnas_t['estacion'].append(t.estacion)
+        columnas_t['duracion'].append(t.duracion)
+        columnas_t['estado'].append(t.estado)
+        columnas_t['num_equipos'].append(len(equipos))
+        for e in equipos:
+            columnas_e['id'].append(e.id)
+            columnas_e['codigo'].append(e.codigo)
+            columnas_e['atendido'].append(1 if e.atendido else 0)
+            for campo in CAMPOS_DICCIONARIO:
+                valores = indices[campo]
+                valor = getattr(e, campo)
+                if valor not in valores:
+                    valores[valor] = len(valores)
+                columnas_e[campo].append(valores[valor])
+
+    return {
+        'turnos': columnas_t,
+        'equipos': columnas_e,
+        # Los dict conservan el orden de inserción: la posición es el índice
+        'diccionarios': {campo: list(valores) for campo, valores in indices.items()},
+    }
 
-    with transaction.atomic():
-        # Limpiar datos existentes para evitar duplicados
-        print(f"Limpiando datos anteriores...")
-        Turno.objects.all().delete()
-        Equipo.objects.all().delete()
-        Responsable.objects.all().delete()
-        
-        print(f"Procesando {len(df)} filas del Excel...")
-        
-        for index, row in df.iterrows():
-            nombre_responsable = str(row.get('RESPONSABLE', '')).strip()
-            email_responsable = str(row.get('EMAIL', '')).strip()
-            if email_responsable.lower() in ['nan', 'nat', '']:
-                email_responsable = None
-            
-            if not nombre_responsable or nombre_responsable.lower() in ['nan', 'nat', '']:
-                continue
 
-            # Actualizar o crear responsable con email
-            responsable, created = Responsable.objects.update_or_create(
-                nombre=nombre_responsable,
-                defaults={'email': email_responsable}
+def serializar_config(config):
+    return {
+        'inicio': config.fecha_inicio.strftime('%Y-%m-%d') if config and config.fecha_inicio else '',
+        'fin': config.fecha_fin.strftime('%Y-%m-%d') if config and config.fecha_fin else '',
+        'modo_exclusion': config.modo_exclusion if config else 'weekends',
+        'estaciones': config.estaciones if config else 1,
+    }
+
+
+# Con más cambios pendientes que esto, al cliente le conviene recargar todo
+MAX_CAMBIOS_DELTA = 5000
+
+
+def cambios_desde(desde):
+    """
+    Cambios del cronograma posteriores al cursor `desde`: turnos y equipos
+    creados o modificados (estado actual), ids eliminados, y la lista de
+    feriados o la configuración si cambiaron. Con "reiniciar" el cliente
+    debe recargar todo desde api_get_datos.
+    """
+    ultimo = ultimo_cambio()
+    if desde > ultimo:
+        # Cursor de antes de un reinicio de la base: el registro volvió a empezar
+        return {'cursor': ultimo, 'reiniciar': True}
+    cambios = list(
+        CambioCronograma.objects.filter(id__gt=desde)
+        .values_list('id', 'modelo', 'objeto_id', 'accion')[:MAX_CAMBIOS_DELTA + 1]
+    )
+    cursor = cambios[-1][0] if cambios else desde
+    if len(cambios) > MAX_CAMBIOS_DELTA or any(c[1] == 'reset' for c in cambios):
+        return {'cursor': ultimo_cambio(), 'reiniciar': True}
+
+    # Solo cuenta la última acción sobre cada objeto
+    ultimos = {}
+    for _, modelo, objeto_id, accion in cambios:
+        ultimos[(modelo, objeto_id)] = accion
+    ids = {'turno': set(), 'equipo': set()}
+    eliminados = {'turno': set(), 'equipo': set()}
+    for (modelo, objeto_id), accion in ultimos.items():
+        # Registros sin id de versiones anteriores no identifican ningún objeto
+        if modelo in ids and objeto_id is not None:
+            (eliminados if accion == 'delete' else ids)[modelo].add(objeto_id)
+
+    turnos = list(
+        Turno.objects.filter(id__in=ids['turno'])
+        .select_related('responsable').prefetch_related('responsable__equipos')
+    )
+    equipos = list(Equipo.objects.filter(id__in=ids['equipo']).select_related('responsable__turno'))
+    # Lo que ya no existe se informa como eliminado
+    eliminados['turno'] |= ids['turno'] - {t.id for t in turnos}
+    eliminados['equipo'] |= ids['equipo'] - {e.id for e in equipos}
+
+    datos = {
+        'cursor': cursor,
+        'turnos': [serializar_turno(t) for t in turnos],
+        'equipos': [
+            {**serializar_equipo(e), 'turno_id': getattr(getattr(e.responsable, 'turno', None), 'id', None)}
+            for e in equipos
+        ],
+        'eliminados': {modelo: sorted(valores) for modelo, valores in eliminados.items()},
+    }
+    if ('feriado', None) in ultimos:
+        datos['feriados'] = [f.strftime('%Y-%m-%d') for f in Feriado.objects.values_list('fecha', flat=True)]
+    if ('config', None) in ultimos:
+        datos['config'] = serializar_config(ConfiguracionCronograma.objects.last())
+    return datos
+
+
+def carga_por_dia(desde=None, hasta=None):
+    """
+    Carga de cada día con turnos en [desde, hasta], en una sola consulta
+    agrupada por fecha: turnos por estado y equipos totales/atendidos.
+    """
+    estados = [valor for valor, _ in Turno.ESTADO_CHOICES]
+    turnos = Turno.objects.filter(fecha__isnull=False)
+    if desde:
+        turnos = turnos.filter(fecha__gte=desde)
+    if hasta:
+        turnos = turnos.filter(fecha__lte=hasta)
+
+    # Los equipos salen de los contadores del responsable: sin join con Equipo
+    filas = (
+        turnos.values('fecha')
+        .annotate(
+            turnos=Count('id'),
+            **{estado: Count('id', filter=Q(estado=estado)) for estado in estados},
+            equipos=Sum('responsable__num_equipos'),
+            atendidos=Sum('responsable__num_atendidos'),
+        )
+        .order_by('fecha')
+    )
+    return {
+        fila.pop('fecha').strftime('%Y-%m-%d'): fila
+        for fila in filas
+    }
+
+
+def recalcular_contadores(responsable_ids=None):
+    """
+    Recalcula num_equipos/num_atendidos desde los equipos, para los
+    responsables indicados o para todos. Son UPDATEs con subconsultas, por
+    lotes: no se cargan los equipos en memoria. Devuelve las filas actualizadas.
+    """
+    equipos = Equipo.objects.filter(responsable=OuterRef('pk')).order_by().values('responsable')
+    valores = {
+        'num_equipos': Coalesce(Subquery(equipos.annotate(n=Count('id')).values('n')), 0),
+        'num_atendidos': Coalesce(Subquery(equipos.filter(atendido=True).annotate(n=Count('id')).values('n')), 0),
+    }
+    if responsable_ids is None:
+        return Responsable.objects.update(**valores)
+
+    responsable_ids = list(responsable_ids)
+    actualizados = 0
+    for i in range(0, len(responsable_ids), TAMANO_LOTE_IMPORTACION):
+        actualizados += Responsable.objects.filter(
+            id__in=responsable_ids[i:i + TAMANO_LOTE_IMPORTACION]
+        ).update(**valores)
+    return actualizados
+
+
+class ImportadorActivos:
+    """
+    Escribe el inventario en la base de datos con INSERTs masivos.
+    Los responsables se deduplican en pandas y se crean una sola vez,
+    de modo que el número de consultas depende de los lotes y no de las filas.
+
+    En modo incremental no se borra nada al empezar: los responsables se
+    emparejan por nombre y los equipos por código, y solo se aplica la
+    diferencia (altas, cambios y bajas). Los turnos ya asignados y su cola
+    de notificaciones se conservan.
+    """
+
+    CAMPOS_EQUIPO = ['responsable_id', 'marca', 'modelo', 'descripcion']
+
+    def __init__(self, tamano_lote=TAMANO_LOTE_IMPORTACION, incremental=False):
+        self.tamano_lote = tamano_lote
+        self.incremental = incremental
+        self.responsables = {}  # nombre -> id
+        self.emails = {}  # nombre -> email vigente
+        self.emails_modificados = set()
+        self.responsables_vistos = set()
+        self.equipos_previos = set()  # IDs existentes aún no encontrados en el archivo
+        self.equipos_modificados = []
+        self.ultimo_equipo = self.ultimo_turno = 0
+        self.filas = 0
+        self.equipos = 0
+        self.delta = {
+            'responsables_creados': 0, 'responsables_eliminados': 0,
+            'equipos_creados': 0, 'equipos_actualizados': 0, 'equipos_eliminados': 0,
+        }
+        self.inicio = None
+
+    def preparar(self):
+        """
+        Modo completo: limpia los datos existentes para evitar duplicados.
+        Modo incremental: carga el estado actual contra el que se calcula el delta.
+        """
+        self.inicio = time_module.perf_counter()
+        if not self.incremental:
+            print("Limpiando datos anteriores...")
+            Turno.objects.all().delete()
+            Equipo.objects.all().delete()
+            Responsable.objects.all().delete()
+            return
+
+        for r_id, nombre, email in Responsable.objects.values_list('id', 'nombre', 'email'):
+            self.responsables[nombre] = r_id
+            self.emails[nombre] = email
+        self.equipos_previos = set(Equipo.objects.values_list('id', flat=True))
+        # Los ids nuevos se detectan al final comparando con el máximo previo
+        self.ultimo_equipo = max(self.equipos_previos, default=0)
+        self.ultimo_turno = Turno.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+    def procesar_lote(self, df):
+        """Aplica un lote normalizado: responsables nuevos o modificados y sus equipos."""
+        self.filas += len(df)
+
+        # Último email no vacío de cada responsable (como hacía update_or_create fila a fila)
+        emails = df.groupby('responsable', sort=False)['email'].last()
+        nuevos = []
+        for nombre, email in emails.items():
+            if nombre not in self.responsables:
+                nuevos.append(nombre)
+            elif email is not None and email != self.emails[nombre]:
+                # Ya existía (en la BD o en un lote anterior) con otro email
+                self.emails_modificados.add(nombre)
+            if nombre not in self.emails or email is not None:
+                self.emails[nombre] = email
+        self.responsables_vistos.update(emails.index)
+        if nuevos:
+            Responsable.objects.bulk_create(
+                [Responsable(nombre=n, email=emails[n]) for n in nuevos],
+                batch_size=self.tamano_lote
             )
-            
-            # Crear equipo asociado
-            # Prioridad: CODIGO INTERNO > CPDOGP GOBIERNO
-            codigo = row.get('CODIGO_INTERNO')
-            if not codigo or str(codigo).lower() == 'nan':
-                codigo = row.get('CPDOGP_GOBIERNO')
-
-            Equipo.objects.create(
-                responsable=responsable,
-                codigo=codigo,
-                marca=row.get('MARCA'),
-                modelo=row.get('MODELO'),
-                descripcion=row.get('DESCRIPCIÓN') or row.get('DESCRIPCION')
+            # Los IDs se leen de la BD para no depender del soporte de RETURNING
+            self.responsables.update(
+                Responsable.objects.filter(nombre__in=nuevos).values_list('nombre', 'id')
             )
-            
-            # Asegurar que el responsable tenga un turno (estado pendiente por defecto)
-            Turno.objects.get_or_create(responsable=responsable)
-        
-        total_responsables = Responsable.objects.count()
-        total_equipos = Equipo.objects.count()
-        total_turnos = Turno.objects.count()
-        print(f"✅ Datos procesados: {total_responsables} responsables, {total_equipos} equipos, {total_turnos} turnos")
+            self.delta['responsables_creados'] += len(nuevos)
+
+        equipos = [
+            Equipo(
+                responsable_id=self.responsables[fila.responsable],
+                codigo=fila.codigo,
+                marca=fila.marca,
+                modelo=fila.modelo,
+                descripcion=fila.descripcion
+            )
+            for fila in df.itertuples(index=False)
+        ]
+        self.equipos += len(equipos)
+
+        if self.incremental:
+            equipos = self._emparejar_equipos(equipos)
+        Equipo.objects.bulk_create(equipos, batch_size=self.tamano_lote)
+        self.delta['equipos_creados'] += len(equipos)
+
+    def _emparejar_equipos(self, equipos):
+        """
+        Empareja los equipos del lote con los existentes y actualiza los que
+        cambiaron. Devuelve solo los que hay que crear.
+        La clave es el código; los equipos sin código se emparejan por
+        (responsable, marca, modelo, descripción).
+        """
+        codigos = {e.codigo for e in equipos if e.codigo is not None}
+        sin_codigo_de = {e.responsable_id for e in equipos if e.codigo is None}
+
+        existentes = {}  # clave -> [Equipo, ...] aún no emparejados
+        candidatos = Equipo.objects.filter(
+            Q(codigo__in=codigos) | Q(codigo__isnull=True, responsable_id__in=sin_codigo_de)
+        ).only('id', 'codigo', *self.CAMPOS_EQUIPO)
+        for eq in candidatos:
+            if eq.id in self.equipos_previos:
+                existentes.setdefault(self._clave_equipo(eq), []).append(eq)
+
+        por_crear, por_actualizar = [], []
+        for nuevo in equipos:
+            coincidencias = existentes.get(self._clave_equipo(nuevo))
+            if not coincidencias:
+                por_crear.append(nuevo)
+                continue
+            actual = coincidencias.pop()
+            self.equipos_previos.discard(actual.id)
+            if any(getattr(actual, c) != getattr(nuevo, c) for c in self.CAMPOS_EQUIPO):
+                for campo in self.CAMPOS_EQUIPO:
+                    setattr(actual, campo, getattr(nuevo, campo))
+                por_actualizar.append(actual)
+
+        Equipo.objects.bulk_update(por_actualizar, self.CAMPOS_EQUIPO, batch_size=self.tamano_lote)
+        self.delta['equipos_actualizados'] += len(por_actualizar)
+        self.equipos_modificados.extend(e.id for e in por_actualizar)
+        return por_crear
+
+    @staticmethod
+    def _clave_equipo(equipo):
+        if equipo.codigo is not None:
+            return equipo.codigo
+        return (equipo.responsable_id, equipo.marca, equipo.modelo, equipo.descripcion)
+
+    def finalizar(self):
+        """
+        Aplica las bajas (modo incremental), asegura que cada responsable tenga
+        un turno (estado pendiente por defecto) y devuelve las estadísticas.
+        """
+        if self.emails_modificados:
+            Responsable.objects.bulk_update(
+                [Responsable(id=self.responsables[n], email=self.emails[n]) for n in self.emails_modificados],
+                ['email'],
+                batch_size=self.tamano_lote
+            )
+
+        if self.incremental:
+            ausentes = [r_id for nombre, r_id in self.responsables.items() if nombre not in self.responsables_vistos]
+            equipos_ausentes = list(self.equipos_previos)
+            for i in range(0, len(equipos_ausentes), self.tamano_lote):
+                Equipo.objects.filter(id__in=equipos_ausentes[i:i + self.tamano_lote]).delete()
+            # El borrado en cascada elimina también su turno y sus notificaciones
+            turnos_eliminados = []
+            for i in range(0, len(ausentes), self.tamano_lote):
+                lote = ausentes[i:i + self.tamano_lote]
+                turnos_eliminados.extend(Turno.objects.filter(responsable_id__in=lote).values_list('id', flat=True))
+                Responsable.objects.filter(id__in=lote).delete()
+            for nombre in [n for n in self.responsables if n not in self.responsables_vistos]:
+                del self.responsables[nombre]
+            self.delta['equipos_eliminados'] = len(equipos_ausentes)
+            self.delta['responsables_eliminados'] = len(ausentes)
+
+        # Los equipos se crean, mueven y borran en bloque: recalcular es más simple que seguirlos uno a uno
+        recalcular_contadores(self.responsables.values())
+
+        sin_turno = Responsable.objects.filter(turno__isnull=True).values_list('id', flat=True)
+        Turno.objects.bulk_create(
+            [Turno(responsable_id=r_id) for r_id in sin_turno],
+            batch_size=self.tamano_lote
+        )
+        # La versión se sube recién aquí, con todo ya escrito: su fila queda
+        # bloqueada hasta el commit y los demás escritores (registrar_cambios)
+        # esperan solo este último tramo, no la importación entera
+        if self.incremental:
+            cambios = [
+                ('equipo', equipos_ausentes, 'delete'),
+                ('turno', turnos_eliminados, 'delete'),
+                ('equipo', self.equipos_modificados + list(
+                    Equipo.objects.filter(id__gt=self.ultimo_equipo).values_list('id', flat=True)
+                ), 'upsert'),
+                ('turno', list(Turno.objects.filter(id__gt=self.ultimo_turno).values_list('id', flat=True)), 'upsert'),
+            ]
+            for modelo, ids, accion in cambios:
+                registrar_cambios(modelo, ids, accion)
+        else:
+            registrar_cambios('reset')
+
+        segundos = time_module.perf_counter() - self.inicio
+        return {
+            'filas': self.filas,
+            'responsables': len(self.responsables),
+            'equipos': self.equipos,
+            **self.delta,
+            'segundos': round(segundos, 3),
+            'filas_por_segundo': round(self.filas / segundos) if segundos > 0 else self.filas,
+        }
+
+
+def leer_archivo_por_lotes(archivo, tamano_lote=TAMANO_LOTE_IMPORTACION):
+    """
+    Lee el inventario por bloques de `tamano_lote` filas y los devuelve como
+    DataFrames crudos, sin cargar el libro completo en memoria.
+    - .xlsx/.xlsm: openpyxl en modo read_only (iteración fila a fila).
+    - .csv: pandas con chunksize.
+    - Otros formatos (.xls): no admiten streaming, se leen completos y se trocean.
+    """
+    nombre = str(getattr(archivo, 'name', archivo)).lower()
+
+    if nombre.endswith('.csv'):
+        yield from pd.read_csv(archivo, chunksize=tamano_lote)
+        return
+
+    if nombre.endswith(('.xlsx', '.xlsm')):
+        wb = load_workbook(archivo, read_only=True, data_only=True)
+        try:
+            filas = wb.active.iter_rows(values_only=True)
+            encabezados = next(filas, None)
+            if encabezados is None:
+                return
+            lote = []
+            for fila in filas:
+                lote.append(fila)
+                if len(lote) >= tamano_lote:
+                    yield pd.DataFrame(lote, columns=encabezados)
+                    lote = []
+            if lote:
+                yield pd.DataFrame(lote, columns=encabezados)
+        finally:
+            wb.close()
+        return
+
+    df = pd.read_excel(archivo)
+    for i in range(0, len(df), tamano_lote):
+        yield df.iloc[i:i + tamano_lote].copy()
+
+
+def procesar_archivo_activos(archivo, incremental=False, tamano_lote=TAMANO_LOTE_IMPORTACION):
+    """
+    Procesa el archivo Excel cargado, crea Responsables y Equipos.
+    - incremental=False (por defecto): limpia los datos existentes y recarga todo desde cero.
+    - incremental=True: aplica solo las diferencias respecto a los datos actuales
+      (responsables por nombre, equipos por código) y conserva turnos y notificaciones.
+      Los responsables y equipos que no estén en el archivo se eliminan, con sus turnos.
+    El archivo se lee por lotes, así que la memoria no crece con el tamaño del archivo.
+    Devuelve un dict con estadísticas (filas, delta aplicado, filas_por_segundo).
+    """
+    importador = ImportadorActivos(tamano_lote, incremental=incremental)
+
+    with transaction.atomic():
+        importador.preparar()
+        for lote in leer_archivo_por_lotes(archivo, tamano_lote):
+            importador.procesar_lote(normalizar_activos(lote))
+            print(f"Procesadas {importador.filas} filas del Excel...")
+        stats = importador.finalizar()
+
+    print(f"✅ Datos procesados: {stats['responsables']} responsables, {stats['equipos']} equipos "
+          f"({stats['filas_por_segundo']} filas/s)")
+    return stats
+
+def contar_filas(archivo):
+    """
+    Estima el número de filas de datos sin leer el archivo en memoria.
+    Devuelve None si el formato no lo permite.
+    """
+    nombre = str(getattr(archivo, 'name', archivo)).lower()
+    if nombre.endswith(('.xlsx', '.xlsm')):
+        wb = load_workbook(archivo, read_only=True)
+        try:
+            max_row = wb.active.max_row
+        finally:
+            wb.close()
+        return max(max_row - 1, 0) if max_row else None
+    if nombre.endswith('.csv'):
+        with open(archivo, 'rb') as f:
+            return max(sum(1 for _ in f) - 1, 0)
+    return None
+
+
+def iniciar_trabajo_importacion(archivo, incremental=False):
+    """
+    Guarda el archivo subido en disco y lanza su importación en un hilo aparte.
+    Devuelve el TrabajoImportacion creado para consultar su progreso.
+    """
+    trabajo = TrabajoImportacion(nombre_original=archivo.name, incremental=incremental)
+    trabajo.archivo.save(archivo.name, archivo, save=False)
+    trabajo.save()
+
+    threading.Thread(
+        target=ejecutar_trabajo_importacion,
+        args=(trabajo.id,),
+        name=f"importacion-{trabajo.id}",
+        daemon=True
+    ).start()
+    return trabajo
+
+
+# Progreso de las importaciones en curso (trabajo_id -> campos). La importación
+# corre en una sola transacción, así que el progreso no puede escribirse en
+# TrabajoImportacion: otras conexiones no lo verían hasta el final. Se publica
+# en la caché 'importaciones', compartida por todos los procesos.
+CACHE_PROGRESO = 'importaciones'
+# Por si el proceso muere a mitad de importación sin borrar su entrada
+PROGRESO_SEGUNDOS = 6 * 3600
+
+
+def _clave_progreso(trabajo_id):
+    return f'core:importacion:{trabajo_id}'
+
+
+def progreso_importacion(trabajo_id):
+    """Filas procesadas y velocidad de una importación en curso, o None."""
+    return caches[CACHE_PROGRESO].get(_clave_progreso(trabajo_id))
+
+
+def ejecutar_trabajo_importacion(trabajo_id, tamano_lote=TAMANO_LOTE_IMPORTACION):
+    """
+    Procesa un TrabajoImportacion publicando su progreso tras cada lote.
+    Limpieza, lotes y finalización van en una sola transacción, igual que en
+    procesar_archivo_activos: si algo falla a mitad del archivo, los datos
+    anteriores quedan intactos en lugar de a medio reemplazar.
+    """
+    trabajo = TrabajoImportacion.objects.get(id=trabajo_id)
+    ruta = trabajo.archivo.path
+    progreso = TrabajoImportacion.objects.filter(id=trabajo_id)
+
+    try:
+        progreso.update(
+            estado='procesando',
+            iniciado=timezone.now(),
+            filas_totales=contar_filas(ruta)
+        )
+        importador = ImportadorActivos(tamano_lote, incremental=trabajo.incremental)
+        with transaction.atomic():
+            importador.preparar()
+            for lote in leer_archivo_por_lotes(ruta, tamano_lote):
+                importador.procesar_lote(normalizar_activos(lote))
+                segundos = time_module.perf_counter() - importador.inicio
+                caches[CACHE_PROGRESO].set(_clave_progreso(trabajo_id), {
+                    'filas_procesadas': importador.filas,
+                    'filas_por_segundo': round(importador.filas / segundos, 1) if segundos > 0 else 0,
+                }, PROGRESO_SEGUNDOS)
+            stats = importador.finalizar()
+
+        progreso.update(
+            estado='completado',
+            filas_procesadas=stats['filas'],
+            filas_por_segundo=stats['filas_por_segundo'],
+            resultado=stats,
+            finalizado=timezone.now()
+        )
+        print(f"✅ Importación {trabajo_id} completada: {stats['filas']} filas ({stats['filas_por_segundo']} filas/s)")
+    except Exception as e:
+        traceback.print_exc()
+        progreso.update(estado='error', errores=str(e), finalizado=timezone.now())
+    finally:
+        caches[CACHE_PROGRESO].delete(_clave_progreso(trabajo_id))
+        trabajo.archivo.delete(save=False)
+        progreso.update(archivo='')
+        # El hilo abre su propia conexión; cerrarla evita dejarla colgada
+        connection.close()
+
+# Días de la semana laborables (lunes a domingo) según ConfiguracionCronograma.modo_exclusion
+MASCARAS_SEMANA = {
+    'none': '1111111',
+    'sundays': '1111110',
+    'weekends': '1111100',
+}
+
+
+def _a_minutos(hora):
+    return hora.hour * 60 + hora.minute
+
+
+def plantilla_diaria(config):
+    """
+    Minutos desde medianoche en que empieza cada slot válido de un día.
+    Se calcula una sola vez: los slots van de hora_inicio en pasos de
+    duracion_turno, terminan antes de hora_fin y no se solapan con el almuerzo.
+    """
+    duracion = config.duracion_turno
+    inicio = _a_minutos(config.hora_inicio)
+    fin = _a_minutos(config.hora_fin)
+    if duracion <= 0 or fin - inicio < duracion:
+        return np.empty(0, dtype=np.int32)
+
+    inicios = np.arange(inicio, fin - duracion + 1, duracion, dtype=np.int32)
+
+    # Un slot cae en almuerzo si empieza antes del fin del almuerzo Y termina después del inicio del almuerzo
+    almuerzo = _a_minutos(config.hora_almuerzo)
+    fin_almuerzo = almuerzo + config.duracion_almuerzo
+    en_almuerzo = (inicios < fin_almuerzo) & (inicios + duracion > almuerzo)
+    return inicios[~en_almuerzo]
+
+
+# Segundos que se reutiliza la lista de feriados en caché. Cada proceso tiene
+# su propia caché (LocMemCache): los cambios hechos en otro worker se ven al expirar.
+CACHE_FERIADOS_SEGUNDOS = 60
+CLAVE_CACHE_FERIADOS = 'core:feriados'
+
+
+def obtener_feriados():
+    """Lista de fechas feriadas, servida desde la caché cuando es posible."""
+    return cache.get_or_set(
+        CLAVE_CACHE_FERIADOS,
+        lambda: list(Feriado.objects.values_list('fecha', flat=True)),
+        CACHE_FERIADOS_SEGUNDOS
+    )
+
+
+def invalidar_cache_feriados():
+    cache.delete(CLAVE_CACHE_FERIADOS)
+
+
+def calendario_laboral(config, feriados=None):
+    """
+    numpy.busdaycalendar con los días laborables de la configuración
+    (modo_exclusion) y los feriados como días no laborables.
+    """
+    if feriados is None:
+        feriados = Feriado.objects.values_list('fecha', flat=True)
+    return np.busdaycalendar(
+        weekmask=MASCARAS_SEMANA.get(config.modo_exclusion, MASCARAS_SEMANA['none']),
+        holidays=np.array(list(feriados), dtype='datetime64[D]')
+    )
+
+
+def dias_laborables(config, feriados=None):
+    """
+    Fechas laborables del período (datetime64[D]), excluyendo fines de semana
+    según modo_exclusion y los feriados.
+    """
+    dias = np.arange(
+        np.datetime64(config.fecha_inicio, 'D'),
+        np.datetime64(config.fecha_fin, 'D') + 1
+    )
+    return dias[np.is_busday(dias, busdaycal=calendario_laboral(config, feriados))]
+
+
+def capacidad_slots(config, feriados=None):
+    """
+    Devuelve (total_slots, dias_laborables) sin generar los slots:
+    slots por día × estaciones × días laborables del período.
+    """
+    por_dia = len(plantilla_diaria(config)) * config.estaciones
+    if por_dia == 0 or config.fecha_fin < config.fecha_inicio:
+        return 0, 0
+    dias = int(np.busday_count(
+        np.datetime64(config.fecha_inicio, 'D'),
+        np.datetime64(config.fecha_fin, 'D') + 1,
+        busdaycal=calendario_laboral(config, feriados)
+    ))
+    return por_dia * dias, dias
+
+
+def iterar_slots(config, feriados=None):
+    """
+    Genera (fecha, hora, estacion) de cada slot en orden cronológico, de forma
+    perezosa: cada día laborable se calcula solo cuando se consumen sus slots.
+    En cada hora se ocupan primero todas las estaciones antes de pasar a la siguiente.
+    """
+    horas = [time(m // 60, m % 60) for m in plantilla_diaria(config)]
+    if not horas or config.estaciones < 1:
+        return
+    estaciones = range(1, config.estaciones + 1)
+    calendario = calendario_laboral(config, feriados)
+    fin = np.datetime64(config.fecha_fin, 'D')
+    dia = np.busday_offset(np.datetime64(config.fecha_inicio, 'D'), 0, roll='forward', busdaycal=calendario)
+    while dia <= fin:
+        fecha = dia.item()
+        for hora in horas:
+            for estacion in estaciones:
+                yield fecha, hora, estacion
+        dia = np.busday_offset(dia, 1, busdaycal=calendario)
+
+
+class SlotsCronograma:
+    """
+    Slots del cronograma en forma compacta: un array de días laborables, la
+    plantilla de minutos de un día y el número de estaciones. Los slots se
+    ordenan por día, hora y estación; no se crea un objeto por slot.
+    """
+
+    def __init__(self, dias, minutos, estaciones=1):
+        self.dias = dias
+        self.minutos = minutos
+        self.estaciones = estaciones
+
+    def __len__(self):
+        return len(self.dias) * len(self.minutos) * self.estaciones
+
+    @property
+    def num_dias(self):
+        """Días que tienen al menos un slot."""
+        return len(self.dias) if len(self.minutos) and self.estaciones else 0
+
+    @property
+    def fechas(self):
+        """Fecha de cada slot (datetime64[D]), en orden cronológico."""
+        return np.repeat(self.dias, len(self.minutos) * self.estaciones)
+
+    @property
+    def minutos_slot(self):
+        """Minuto de inicio de cada slot, alineado con `fechas`."""
+        return np.tile(np.repeat(self.minutos, self.estaciones), len(self.dias))
+
+    @property
+    def estacion_slot(self):
+        """Estación (1..N) de cada slot, alineada con `fechas`."""
+        return np.tile(np.arange(1, self.estaciones + 1), len(self.dias) * len(self.minutos))
+
+    def slot(self, i):
+        """(fecha, hora, estacion) del slot i."""
+        i, estacion = divmod(i, self.estaciones)
+        dia, j = divmod(i, len(self.minutos))
+        minutos = int(self.minutos[j])
+        return self.dias[dia].item(), time(minutos // 60, minutos % 60), estacion + 1
+
+
+def generar_slots_compactos(config, feriados=None):
+    """
+    Genera los slots disponibles como arrays (ver SlotsCronograma).
+    """
+    return SlotsCronograma(dias_laborables(config, feriados), plantilla_diaria(config), config.estaciones)
+
 
 def generar_slots(config):
     """
     Genera todos los slots disponibles basados en la configuración.
+    Devuelve una lista de dicts {'fecha', 'hora', 'estacion'}; para rangos
+    grandes conviene usar generar_slots_compactos.
     """
-    slots = []
-    feriados = set(Feriado.objects.values_list('fecha', flat=True))
-    
-    fecha_actual = config.fecha_inicio
-    while fecha_actual <= config.fecha_fin:
-        # Lógica de exclusión granular
-        es_sabado = fecha_actual.weekday() == 5
-        es_domingo = fecha_actual.weekday() == 6
-        
-        excluir = False
-        if config.modo_exclusion == 'weekends':
-            if es_sabado or es_domingo: excluir = True
-        elif config.modo_exclusion == 'sundays':
-            if es_domingo: excluir = True
-            
-        if not excluir and fecha_actual not in feriados:
-            
-            # Hora de inicio y fin como datetime para iterar
-            curr_dt = datetime.combine(fecha_actual, config.hora_inicio)
-            end_dt = datetime.combine(fecha_actual, config.hora_fin)
-            
-            # Almuerzo
-            lunch_start = datetime.combine(fecha_actual, config.hora_almuerzo)
-            lunch_end = lunch_start + timedelta(minutes=config.duracion_almuerzo)
-            
-            while curr_dt + timedelta(minutes=config.duracion_turno) <= end_dt:
-                slot_end = curr_dt + timedelta(minutes=config.duracion_turno)
-                
-                # Validar si el slot cae en almuerzo
-                # Un slot cae en almuerzo si empieza antes del fin del almuerzo Y termina después del inicio del almuerzo
-                if not (curr_dt < lunch_end and slot_end > lunch_start):
-                    slots.append({
-                        'fecha': fecha_actual,
-                        'hora': curr_dt.time()
-                    })
-                
-                curr_dt += timedelta(minutes=config.duracion_turno)
-                
-        fecha_actual += timedelta(days=1)
-    
-    return slots
+    slots = generar_slots_compactos(config)
+    return [
+        {'fecha': fecha, 'hora': hora, 'estacion': estacion}
+        for fecha, hora, estacion in map(slots.slot, range(len(slots)))
+    ]
+
+def segmentos_diarios(config):
+    """
+    Divide la plantilla diaria en tramos de slots consecutivos (normalmente
+    mañana y tarde, separados por el almuerzo).
+    Devuelve una lista de (minuto_inicio, num_slots).
+    """
+    minutos = plantilla_diaria(config)
+    if not len(minutos):
+        return []
+    cortes = np.flatnonzero(np.diff(minutos) != config.duracion_turno) + 1
+    return [(int(tramo[0]), len(tramo)) for tramo in np.split(minutos, cortes)]
+
+
+def tamanos_turnos(config, cantidades_equipos):
+    """
+    Slots consecutivos que necesita cada turno. En modo 'fijo' siempre uno;
+    en modo 'por_equipo' uno por equipo del responsable, con mínimo uno y
+    como máximo el tramo más largo del día (un turno no puede partirse).
+    """
+    if config.modo_duracion != 'por_equipo':
+        return [1] * len(cantidades_equipos)
+    tope = max((n for _, n in segmentos_diarios(config)), default=1)
+    return [min(max(n, 1), tope) for n in cantidades_equipos]
+
+
+def celdas_ocupadas(config):
+    """
+    Celdas (fecha, minuto, estacion) que ya ocupan los turnos asignados, en
+    proceso o completados, para que una nueva asignación no las reutilice.
+    """
+    ocupadas = set()
+    turnos = Turno.objects.exclude(estado='pendiente').filter(
+        fecha__isnull=False, hora__isnull=False
+    ).values_list('fecha', 'hora', 'estacion', 'duracion')
+    for fecha, hora, estacion, duracion in turnos:
+        inicio = _a_minutos(hora)
+        for i in range(max(-(-(duracion or 0) // config.duracion_turno), 1)):
+            ocupadas.add((fecha, inicio + i * config.duracion_turno, estacion))
+    return ocupadas
+
+
+def slots_ocupados(config, ocupadas, feriados=None):
+    """
+    Cuántas de las celdas `ocupadas` (ver celdas_ocupadas) son slots válidos
+    del período de `config`: días laborables, minutos de la plantilla y
+    estaciones configuradas. Es lo que hay que descontar de capacidad_slots.
+    """
+    minutos = set(plantilla_diaria(config).tolist())
+    fechas = [
+        fecha for fecha, minuto, estacion in ocupadas
+        if config.fecha_inicio <= fecha <= config.fecha_fin
+        and minuto in minutos and 1 <= estacion <= config.estaciones
+    ]
+    if not fechas:
+        return 0
+    return int(np.is_busday(
+        np.array(fechas, dtype='datetime64[D]'), busdaycal=calendario_laboral(config, feriados)
+    ).sum())
+
+
+def _huecos(fecha, inicio, num_slots, estacion, duracion, ocupadas):
+    """Subtramos libres (minuto_inicio, num_slots) de un tramo, saltando las celdas ocupadas."""
+    if not ocupadas:
+        return [(inicio, num_slots)]
+    huecos = []
+    hueco_inicio, largo = inicio, 0
+    for i in range(num_slots):
+        minuto = inicio + i * duracion
+        if (fecha, minuto, estacion) in ocupadas:
+            if largo:
+                huecos.append((hueco_inicio, largo))
+            hueco_inicio, largo = minuto + duracion, 0
+        else:
+            largo += 1
+    if largo:
+        huecos.append((hueco_inicio, largo))
+    return huecos
+
+
+def empaquetar_turnos(config, tamanos, feriados=None, ocupadas=()):
+    """
+    Ubica turnos de duración variable con First-Fit Decreasing: los turnos se
+    toman de mayor a menor y cada uno va al primer tramo (día, mañana/tarde,
+    estación) en orden cronológico que tenga espacio libre suficiente.
+    Los días se abren solo cuando ningún tramo ya abierto admite el turno.
+
+    `tamanos` indica los slots que ocupa cada turno y `ocupadas` las celdas
+    ya tomadas (ver celdas_ocupadas), que parten los tramos. Devuelve una
+    lista alineada con `tamanos` de (fecha, hora, estacion), con None para
+    los turnos que no caben en el período.
+    """
+    resultado = [None] * len(tamanos)
+    segmentos = segmentos_diarios(config)
+    if not segmentos or config.estaciones < 1:
+        return resultado
+
+    tope = max(n for _, n in segmentos)
+    calendario = calendario_laboral(config, feriados)
+    fin = np.datetime64(config.fecha_fin, 'D')
+    dia = np.busday_offset(np.datetime64(config.fecha_inicio, 'D'), 0, roll='forward', busdaycal=calendario)
+
+    # tramos[i] = [fecha, próximo minuto libre, estación, slots libres]; el índice
+    # sigue el orden cronológico. libres[c] es un heap con los tramos que tienen
+    # exactamente c slots libres, así "el primero que cabe" es el menor tope de
+    # los heaps c >= tamaño.
+    tramos = []
+    libres = [[] for _ in range(tope + 1)]
+
+    for i in sorted(range(len(tamanos)), key=lambda i: -tamanos[i]):
+        k = min(max(tamanos[i], 1), tope)
+        while True:
+            candidatos = [libres[c][0] for c in range(k, tope + 1) if libres[c]]
+            if candidatos or dia > fin:
+                break
+            fecha = dia.item()
+            for inicio, num_slots in segmentos:
+                for estacion in range(1, config.estaciones + 1):
+                    for inicio_libre, libres_tramo in _huecos(fecha, inicio, num_slots, estacion, config.duracion_turno, ocupadas):
+                        heapq.heappush(libres[libres_tramo], len(tramos))
+                        tramos.append([fecha, inicio_libre, estacion, libres_tramo])
+            dia = np.busday_offset(dia, 1, busdaycal=calendario)
+        if not candidatos:
+            continue  # No cabe, pero un turno más corto todavía puede caber
+
+        idx = min(candidatos)
+        tramo = tramos[idx]
+        heapq.heappop(libres[tramo[3]])
+        resultado[i] = (tramo[0], time(tramo[1] // 60, tramo[1] % 60), tramo[2])
+        tramo[1] += k * config.duracion_turno
+        tramo[3] -= k
+        if tramo[3]:
+            heapq.heappush(libres[tramo[3]], idx)
+    return resultado
+
+
+class IndiceOcupacion:
+    """
+    Índice en memoria de la ocupación del cronograma. Cada slot válido tiene
+    una posición global (día, celda de la plantilla, estación) en orden
+    cronológico; las posiciones libres se guardan en una lista ordenada, así
+    el slot libre más cercano a un punto se encuentra con bisect.
+    Un turno ocupa tantas celdas consecutivas como slots dure, sin cruzar el almuerzo.
+    """
+
+    def __init__(self, config, feriados=None):
+        self.config = config
+        self.slots = generar_slots_compactos(config, feriados)
+        self.num_celdas = len(self.slots.minutos)
+        self.estaciones = config.estaciones
+        self.libres = list(range(len(self.slots)))
+        self.ocupantes = {}  # posición -> turno_id
+        self.posiciones_turno = {}  # turno_id -> posiciones
+        # Tramo (mañana/tarde) de cada celda del día
+        self.tramo_celda = np.concatenate((
+            [0], np.cumsum(np.diff(self.slots.minutos) != config.duracion_turno)
+        )) if self.num_celdas else np.empty(0, dtype=np.int64)
+
+    def slots_de(self, duracion):
+        """Slots que ocupa un turno de `duracion` minutos (al menos uno)."""
+        if not duracion:
+            return 1
+        return max(-(-duracion // self.config.duracion_turno), 1)
+
+    def _posiciones(self, dia, celda, estacion, num_slots):
+        fin = celda + num_slots - 1
+        if fin >= self.num_celdas or self.tramo_celda[celda] != self.tramo_celda[fin]:
+            return None
+        base = (dia * self.num_celdas + celda) * self.estaciones + estacion - 1
+        return [base + i * self.estaciones for i in range(num_slots)]
+
+    def posiciones(self, fecha, hora, estacion=1, num_slots=1):
+        """
+        Posiciones que ocuparía un turno que empieza en (fecha, hora, estacion),
+        o None si ese punto no es el inicio de un slot válido.
+        """
+        if fecha is None or hora is None or not 1 <= estacion <= self.estaciones:
+            return None
+        dia64 = np.datetime64(fecha, 'D')
+        dia = int(np.searchsorted(self.slots.dias, dia64))
+        if dia == len(self.slots.dias) or self.slots.dias[dia] != dia64:
+            return None
+        minuto = _a_minutos(hora)
+        celda = int(np.searchsorted(self.slots.minutos, minuto))
+        if celda == self.num_celdas or self.slots.minutos[celda] != minuto:
+            return None
+        return self._posiciones(dia, celda, estacion, num_slots)
+
+    def _posicion_desde(self, fecha, hora):
+        """Primera posición en o después de (fecha, hora)."""
+        dia64 = np.datetime64(fecha, 'D')
+        dia = int(np.searchsorted(self.slots.dias, dia64))
+        celda = 0
+        if dia < len(self.slots.dias) and self.slots.dias[dia] == dia64:
+            celda = int(np.searchsorted(self.slots.minutos, _a_minutos(hora)))
+        return (dia * self.num_celdas + celda) * self.estaciones
+
+    def esta_libre(self, posiciones, turno_id=None):
+        """True si las posiciones están libres u ocupadas por el propio turno_id."""
+        return all(self.ocupantes.get(p, turno_id) == turno_id for p in posiciones)
+
+    def ocupar(self, turno_id, posiciones):
+        self.liberar(turno_id)
+        for p in posiciones:
+            del self.libres[bisect_left(self.libres, p)]
+            self.ocupantes[p] = turno_id
+        self.posiciones_turno[turno_id] = posiciones
+
+    def cargar(self, turnos):
+        """
+        Ocupa de una vez los slots de varios turnos (objetos con id, fecha,
+        hora, estacion y duracion); los que no están en un slot válido o
+        chocan con uno ya cargado se ignoran. Devuelve los ids ignorados.
+        """
+        ignorados = []
+        for t in turnos:
+            posiciones = self.posiciones(t.fecha, t.hora, t.estacion, self.slots_de(t.duracion))
+            if posiciones and self.esta_libre(posiciones):
+                for p in posiciones:
+                    self.ocupantes[p] = t.id
+                self.posiciones_turno[t.id] = posiciones
+            else:
+                ignorados.append(t.id)
+        # Reconstruir la lista de libres una sola vez en lugar de borrar posición por posición
+        self.libres = [p for p in range(len(self.slots)) if p not in self.ocupantes]
+        return ignorados
+
+    def liberar(self, turno_id):
+        for p in self.posiciones_turno.pop(turno_id, ()):
+            del self.ocupantes[p]
+            insort(self.libres, p)
+
+    def buscar_libre(self, fecha, hora, num_slots=1, estacion=None, hacia_atras=False,
+                     no_antes_de=None, no_despues_de=None):
+        """
+        Posiciones libres más cercanas a (fecha, hora): la primera hacia adelante
+        (sin pasar de `no_despues_de`) o, con hacia_atras, la última anterior
+        (sin pasar de `no_antes_de`). Con un solo slot y sin estación fija
+        basta un bisect, O(log n); si no, se recorren los huecos libres desde
+        ese punto. Devuelve None si no hay lugar.
+        """
+        inicio = bisect_left(self.libres, self._posicion_desde(fecha, hora))
+        if hacia_atras:
+            minimo = self._posicion_desde(no_antes_de, time(0)) if no_antes_de else 0
+            maximo = len(self.slots)
+            candidatos = range(inicio - 1, -1, -1)
+        else:
+            minimo = 0
+            maximo = self._posicion_desde(no_despues_de + timedelta(days=1), time(0)) if no_despues_de else len(self.slots)
+            candidatos = range(inicio, len(self.libres))
+        for i in candidatos:
+            p = self.libres[i]
+            if p < minimo or p >= maximo:
+                break
+            dia_celda, est = divmod(p, self.estaciones)
+            if estacion and est + 1 != estacion:
+                continue
+            posiciones = self._posiciones(*divmod(dia_celda, self.num_celdas), est + 1, num_slots)
+            if posiciones and self.esta_libre(posiciones):
+                return posiciones
+        return None
+
+    def ubicacion(self, posiciones):
+        """(fecha, hora, estacion) donde empiezan las posiciones."""
+        return self.slots.slot(posiciones[0])
+
+
+def descartar_recordatorios(turno_ids):
+    """
+    Borra los recordatorios aún no enviados de turnos que cambiaron de lugar;
+    la próxima sincronización de la cola los vuelve a crear con la hora nueva.
+    """
+    from notifications.models import NotificacionEncolada
+    NotificacionEncolada.objects.filter(
+        turno__in=turno_ids, estado__in=['pendiente', 'error_temporal']
+    ).delete()
+
+
+# Índice de ocupación compartido por las peticiones de este proceso, válido
+# para la versión de los datos con la que se construyó (ver indice_ocupacion)
+_indice = {'clave': None, 'indice': None}
+_bloqueo_indice = threading.Lock()
+
+
+def _indice_vigente(config):
+    """El índice compartido, reconstruido solo si la versión de los datos cambió."""
+    clave = (config.pk, VersionDatos.get_solo().version)
+    if _indice['clave'] != clave:
+        indice = IndiceOcupacion(config, obtener_feriados())
+        indice.cargar(
+            Turno.objects.exclude(estado='pendiente')
+            .filter(fecha__isnull=False, hora__isnull=False)
+            .only('id', 'fecha', 'hora', 'estacion', 'duracion')
+        )
+        _indice.update(clave=clave, indice=indice)
+    return _indice['indice']
+
+
+@contextmanager
+def indice_ocupacion(config, excluir=()):
+    """
+    IndiceOcupacion con todos los turnos asignados, en proceso o completados,
+    salvo los ids de `excluir` (p. ej. los turnos que se están moviendo).
+    El índice se conserva entre peticiones y solo se reconstruye cuando la
+    versión de los datos cambió por algo que no lo actualiza (mover_turnos sí
+    lo hace), así que una consulta cuesta O(log n) y no O(slots + turnos).
+    Se usa con `with`: al salir, los turnos de `excluir` vuelven a su lugar
+    y se descarta lo que se haya ocupado dentro del bloque.
+    """
+    with _bloqueo_indice:
+        indice = _indice_vigente(config)
+        originales = {turno_id: indice.posiciones_turno.get(turno_id) for turno_id in excluir}
+        for turno_id in excluir:
+            indice.liberar(turno_id)
+        try:
+            yield indice
+        finally:
+            # Primero se libera todo: en un intercambio, el lugar original de uno lo ocupa el otro
+            for turno_id in originales:
+                indice.liberar(turno_id)
+            for turno_id, posiciones in originales.items():
+                if posiciones:
+                    indice.ocupar(turno_id, posiciones)
+
+
+def _actualizar_indice(turnos, version):
+    """
+    Aplica al índice compartido los turnos que mover_turnos confirmó en la
+    `version` de los datos. Si entretanto hubo otro cambio, el índice queda
+    desfasado y se reconstruirá en la próxima consulta.
+    """
+    with _bloqueo_indice:
+        indice = _indice['indice']
+        if indice is None or _indice['clave'][1] != version - 1:
+            return
+        for t in turnos:
+            indice.liberar(t.id)
+        for t in turnos:
+            if t.estado != 'pendiente':
+                posiciones = indice.posiciones(t.fecha, t.hora, t.estacion, indice.slots_de(t.duracion))
+                if posiciones and indice.esta_libre(posiciones):
+                    indice.ocupar(t.id, posiciones)
+        _indice['clave'] = (_indice['clave'][0], version)
+
+
+def ubicar_turnos(movimientos, resolver=False):
+    """
+    Valida una lista de movimientos (turno, fecha, hora, estacion) contra el
+    resto del cronograma y entre sí, en orden. Un destino ocupado o fuera de
+    la grilla es un conflicto; con `resolver`, el turno pasa al slot libre
+    más cercano del mismo día.
+
+    Devuelve (movimientos_resueltos, conflictos). Cada conflicto es un dict
+    con turno_id, motivo y, si existe, la sugerencia del próximo slot libre.
+    """
+    config = ConfiguracionCronograma.objects.last()
+    if not config or not config.fecha_inicio or not config.fecha_fin:
+        return list(movimientos), []
+
+    resueltos, conflictos = [], []
+    with indice_ocupacion(config, excluir=[turno.id for turno, *_ in movimientos]) as indice:
+        for turno, fecha, hora, estacion in movimientos:
+            if fecha is None or hora is None:
+                resueltos.append((turno, fecha, hora, estacion))
+                continue
+            k = indice.slots_de(turno.duracion)
+            posiciones = indice.posiciones(fecha, hora, estacion, k)
+            if posiciones and indice.esta_libre(posiciones):
+                indice.ocupar(turno.id, posiciones)
+                resueltos.append((turno, fecha, hora, estacion))
+                continue
+
+            motivo = 'ocupado' if posiciones else 'fuera_de_grilla'
+            libre = indice.buscar_libre(fecha, hora, k, no_despues_de=fecha) if resolver else None
+            if resolver and not libre:
+                libre = indice.buscar_libre(fecha, time(0), k, no_despues_de=fecha)
+            if libre:
+                indice.ocupar(turno.id, libre)
+                resueltos.append((turno, *indice.ubicacion(libre)))
+                continue
+
+            sugerencia = indice.buscar_libre(fecha, hora, k)
+            conflictos.append({
+                'turno_id': turno.id,
+                'motivo': motivo,
+                'sugerencia': _slot_json(indice.ubicacion(sugerencia)) if sugerencia else None,
+            })
+    return resueltos, conflictos
+
+
+def _slot_json(ubicacion):
+    fecha, hora, estacion = ubicacion
+    return {'fecha': fecha.strftime('%Y-%m-%d'), 'hora': hora.strftime('%H:%M'), 'estacion': estacion}
+
+
+def siguiente_slot_libre(fecha, hora, num_slots=1, estacion=None, excluir=()):
+    """Próximo slot libre desde (fecha, hora) como dict para JSON, o None."""
+    config = ConfiguracionCronograma.objects.last()
+    if not config or not config.fecha_inicio or not config.fecha_fin:
+        return None
+    with indice_ocupacion(config, excluir=excluir) as indice:
+        posiciones = indice.buscar_libre(fecha, hora, num_slots, estacion)
+        return _slot_json(indice.ubicacion(posiciones)) if posiciones else None
+
+
+def mover_turnos(movimientos, resolver=False):
+    """
+    Aplica en una sola transacción una lista de movimientos
+    (turno, fecha, hora, estacion, estado), validados entre sí y contra el
+    resto del cronograma con ubicar_turnos. Si hay conflictos no se aplica
+    ninguno. Devuelve (turnos_actualizados, conflictos).
+    """
+    estados = {turno.id: estado for turno, *_, estado in movimientos}
+    with transaction.atomic():
+        resueltos, conflictos = ubicar_turnos([m[:4] for m in movimientos], resolver)
+        if conflictos:
+            return [], conflictos
+
+        turnos, movidos = [], []
+        for turno, fecha, hora, estacion in resueltos:
+            if (fecha, hora, estacion) != (turno.fecha, turno.hora, turno.estacion):
+                turno.fecha, turno.hora, turno.estacion = fecha, hora, estacion
+                turno.notificar_el = datetime.combine(fecha, hora) - timedelta(days=1) if fecha and hora else None
+                turno.notificacion_enviada = False
+                movidos.append(turno.id)
+            if estados[turno.id]:
+                turno.estado = estados[turno.id]
+            turnos.append(turno)
+
+        Turno.objects.bulk_update(turnos, ['fecha', 'hora', 'estacion', 'estado', 'notificar_el', 'notificacion_enviada'])
+        descartar_recordatorios(movidos)
+        registrar_cambios('turno', [t.id for t in turnos])
+        # registrar_cambios sube la versión en uno: con ella se actualiza el índice compartido
+        version = VersionDatos.get_solo().version
+        transaction.on_commit(lambda: _actualizar_indice(turnos, version))
+    return turnos, []
+
+
+def reprogramar_turnos():
+    """
+    Reubica solo los turnos asignados cuyo slot dejó de ser válido (feriado
+    nuevo, cambio de horario, período o estaciones) en el slot libre más
+    cercano: primero hacia adelante y, si no hay, hacia atrás sin pasar de hoy.
+    Los demás turnos conservan su asignación y sus notificaciones; los que no
+    entran en ningún lado vuelven a 'pendiente'.
+    """
+    resultado = {'revisados': 0, 'movidos': 0, 'sin_lugar': 0}
+    config = ConfiguracionCronograma.objects.last()
+    if not config or not config.fecha_inicio or not config.fecha_fin:
+        return resultado
+
+    indice = IndiceOcupacion(config, list(Feriado.objects.values_list('fecha', flat=True)))
+    turnos = list(
+        Turno.objects.exclude(estado='pendiente')
+        .filter(fecha__isnull=False, hora__isnull=False)
+        .annotate(cantidad_equipos=F('responsable__num_equipos'))
+        .order_by('fecha', 'hora', 'estacion')
+    )
+    asignados = [t for t in turnos if t.estado == 'asignado']
+    resultado['revisados'] = len(asignados)
+
+    # Los turnos en proceso o completados no se mueven, pero ocupan su lugar
+    for t in turnos:
+        if t.estado != 'asignado':
+            posiciones = indice.posiciones(t.fecha, t.hora, t.estacion, indice.slots_de(t.duracion))
+            if posiciones and indice.esta_libre(posiciones):
+                indice.ocupar(t.id, posiciones)
+
+    tamanos = tamanos_turnos(config, [t.cantidad_equipos for t in asignados])
+    invalidos = []
+    modificados = []
+    for t, k in zip(asignados, tamanos):
+        posiciones = indice.posiciones(t.fecha, t.hora, t.estacion, k)
+        if posiciones and indice.esta_libre(posiciones):
+            indice.ocupar(t.id, posiciones)
+            if t.duracion is not None and t.duracion != k * config.duracion_turno:
+                t.duracion = k * config.duracion_turno
+                modificados.append(t)
+        else:
+            invalidos.append((t, k))
+
+    hoy = timezone.localdate()
+    movidos = []
+    for t, k in invalidos:
+        posiciones = (indice.buscar_libre(t.fecha, t.hora, k)
+                      or indice.buscar_libre(t.fecha, t.hora, k, hacia_atras=True, no_antes_de=hoy))
+        if posiciones:
+            indice.ocupar(t.id, posiciones)
+            t.fecha, t.hora, t.estacion = indice.ubicacion(posiciones)
+            t.duracion = k * config.duracion_turno
+            t.notificar_el = datetime.combine(t.fecha, t.hora) - timedelta(days=1)
+            resultado['movidos'] += 1
+        else:
+            t.estado = 'pendiente'
+            t.fecha = t.hora = t.notificar_el = None
+            resultado['sin_lugar'] += 1
+        t.notificacion_enviada = False
+        movidos.append(t)
+
+    if not movidos and not modificados:
+        return resultado
+
+    with transaction.atomic():
+        Turno.objects.bulk_update(
+            movidos + modificados,
+            ['fecha', 'hora', 'estacion', 'duracion', 'estado', 'notificar_el', 'notificacion_enviada'],
+            batch_size=TAMANO_LOTE_IMPORTACION
+        )
+        descartar_recordatorios([t.id for t in movidos])
+        registrar_cambios('turno', [t.id for t in movidos + modificados])
+    print(f"Reprogramación: {resultado}")
+    return resultado
+
+
+def _slots_insuficientes(total_slots, dias, num_pendientes, slots_requeridos, faltantes):
+    return {
+        'error_type': 'insufficient_slots',
+        'slots_generados': total_slots,
+        'dias_laborables': dias,
+        'usuarios_pendientes': num_pendientes,
+        'slots_requeridos': slots_requeridos,
+        'faltantes': faltantes,
+        'sugerencias': [
+            "Amplía el rango de fechas en la configuración.",
+            "Reduce la duración de cada turno.",
+            "Aumenta el número de estaciones de trabajo.",
+            "Verifica que no haya demasiados feriados configurados.",
+            "Aumenta la jornada laboral diaria."
+        ]
+    }
+
 
 def asignar_turnos_automatico():
     """
@@ -119,11 +1378,13 @@ def asignar_turnos_automatico():
     if not config.fecha_inicio or not config.fecha_fin:
         return 0, "La configuración debe incluir fechas de inicio y fin."
 
-    slots = generar_slots(config)
+    feriados = list(Feriado.objects.values_list('fecha', flat=True))
+    total_slots, dias = capacidad_slots(config, feriados)
     # Ordenar por ID del responsable para mantener el orden del Excel
     turnos_pendientes = Turno.objects.filter(estado='pendiente').order_by('responsable__id')
+    num_pendientes = turnos_pendientes.count()
     
-    if turnos_pendientes.count() == 0:
+    if num_pendientes == 0:
         return 0, {
             'error_type': 'no_pending_turns',
             'message': 'No hay turnos pendientes para asignar. Asegúrate de subir un archivo Excel primero o reiniciar (Reiniciar Sistema) si ya habías generado uno.'
@@ -135,41 +1396,54 @@ def asignar_turnos_automatico():
     print(f"Estadísticas:")
     print(f"  - Total responsables únicos: {total_responsables}")
     print(f"  - Total turnos en BD: {total_turnos}")
-    print(f"  - Turnos pendientes: {turnos_pendientes.count()}")
-    print(f"  - Slots disponibles: {len(slots)}")
+    print(f"  - Turnos pendientes: {num_pendientes}")
+    print(f"  - Slots disponibles: {total_slots}")
     print(f"  - Período: {config.fecha_inicio} a {config.fecha_fin}")
     
-    if len(slots) < turnos_pendientes.count():
-        dias_laborables = len(set([s['fecha'] for s in slots]))
-        return 0, {
-            'error_type': 'insufficient_slots',
-            'slots_generados': len(slots),
-            'dias_laborables': dias_laborables,
-            'usuarios_pendientes': turnos_pendientes.count(),
-            'faltantes': turnos_pendientes.count() - len(slots),
-            'sugerencias': [
-                "Amplía el rango de fechas en la configuración.",
-                "Reduce la duración de cada turno.",
-                "Verifica que no haya demasiados feriados configurados.",
-                "Aumenta la jornada laboral diaria."
-            ]
-        }
+    por_equipo = config.modo_duracion == 'por_equipo'
+    if por_equipo:
+        turnos_pendientes = list(turnos_pendientes.annotate(cantidad_equipos=F('responsable__num_equipos')))
+        tamanos = tamanos_turnos(config, [t.cantidad_equipos for t in turnos_pendientes])
+    else:
+        tamanos = [1] * num_pendientes
+    slots_requeridos = sum(tamanos)
+
+    # Los turnos ya asignados (p. ej. tras una reprogramación) conservan su lugar
+    ocupadas = celdas_ocupadas(config)
+    total_slots -= slots_ocupados(config, ocupadas, feriados)
+    if total_slots < slots_requeridos:
+        return 0, _slots_insuficientes(total_slots, dias, num_pendientes, slots_requeridos, slots_requeridos - total_slots)
+
+    if por_equipo:
+        ubicaciones = empaquetar_turnos(config, tamanos, feriados, ocupadas)
+        sin_lugar = [k for k, ubicacion in zip(tamanos, ubicaciones) if ubicacion is None]
+    else:
+        # Los slots se generan a medida que los turnos los consumen
+        libres = (
+            (fecha, hora, estacion) for fecha, hora, estacion in iterar_slots(config, feriados)
+            if (fecha, _a_minutos(hora), estacion) not in ocupadas
+        )
+        ubicaciones = list(islice(libres, num_pendientes))
+        sin_lugar = [1] * (num_pendientes - len(ubicaciones))
+    if sin_lugar:
+        # Hay slots suficientes en total, pero ocupados o fragmentados entre tramos
+        return 0, _slots_insuficientes(total_slots, dias, num_pendientes, slots_requeridos, sum(sin_lugar))
 
     turnos_actualizados = []
     with transaction.atomic():
-        for i, turno in enumerate(turnos_pendientes):
-            if i < len(slots):
-                turno.fecha = slots[i]['fecha']
-                turno.hora = slots[i]['hora']
-                turno.estado = 'asignado'
-                
-                # Calcular fecha de notificación (1 día antes)
-                fecha_hora_turno = datetime.combine(turno.fecha, turno.hora)
-                turno.notificar_el = fecha_hora_turno - timedelta(days=1)
-                turno.notificacion_enviada = False # Resetear por si acaso
-                
-                turnos_actualizados.append(turno)
+        for turno, k, (fecha, hora, estacion) in zip(turnos_pendientes, tamanos, ubicaciones):
+            turno.fecha, turno.hora, turno.estacion = fecha, hora, estacion
+            turno.duracion = k * config.duracion_turno
+            turno.estado = 'asignado'
+            
+            # Calcular fecha de notificación (1 día antes)
+            fecha_hora_turno = datetime.combine(turno.fecha, turno.hora)
+            turno.notificar_el = fecha_hora_turno - timedelta(days=1)
+            turno.notificacion_enviada = False # Resetear por si acaso
+            
+            turnos_actualizados.append(turno)
         
-        Turno.objects.bulk_update(turnos_actualizados, ['fecha', 'hora', 'estado', 'notificar_el', 'notificacion_enviada'])
+        Turno.objects.bulk_update(turnos_actualizados, ['fecha', 'hora', 'estacion', 'duracion', 'estado', 'notificar_el', 'notificacion_enviada'])
+        registrar_cambios('turno', [t.id for t in turnos_actualizados])
     
     return len(turnos_actualizados), f"Cronograma generado: {len(turnos_actualizados)} turnos asignados correctamente."
@@ -1,3 +1,75 @@
+import json
+from datetime import date, time
+
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
+from django.urls import reverse
+
+from .models import CambioCronograma, ConfiguracionCronograma, Equipo, Responsable, Turno
+from .services import asignar_turnos_automatico, cambios_desde, procesar_archivo_activos, ultimo_cambio
+
+
+def _csv(filas):
+    contenido = "RESPONSABLE,EMAIL,CODIGO_INTERNO,MARCA,MODELO\n" + "".join(
+        f"{r},{r.lower()}@unemi.edu.ec,{c},HP,{m}\n" for r, c, m in filas
+    )
+    return SimpleUploadedFile("activos.csv", contenido.encode())
+
+
+class CambiosDesdeTests(TestCase):
+
+    def test_importacion_sin_bajas_no_registra_ids_vacios(self):
+        filas = [("ANA", "A1", "X"), ("ANA", "A2", "X"), ("LUIS", "L1", "Y")]
+        procesar_archivo_activos(_csv(filas))
+        cursor = ultimo_cambio()
+
+        # Incremental sin bajas ni cambios: no hay nada que registrar
+        procesar_archivo_activos(_csv(filas), incremental=True)
+        self.assertFalse(CambioCronograma.objects.filter(objeto_id__isnull=True).exclude(modelo='reset').exists())
+
+        # Otra que sí elimina un equipo
+        procesar_archivo_activos(_csv(filas[:2]), incremental=True)
+        datos = cambios_desde(cursor)
+
+        self.assertNotIn('reiniciar', datos)
+        eliminado = set(datos['eliminados']['equipo'])
+        self.assertEqual(len(eliminado), 1)
+        self.assertFalse(Equipo.objects.filter(id__in=eliminado).exists())
+
+
+class ActualizarTurnoTests(TestCase):
+
+    def test_rechaza_estado_desconocido(self):
+        turno = Turno.objects.create(responsable=Responsable.objects.create(nombre="ANA"))
+        url = reverse('actualizar_turno', args=[turno.id])
+        for datos in ({'estado': 'bogus'}, {'estacion': 1, 'estado': 'bogus'}):
+            respuesta = self.client.post(url, json.dumps(datos), content_type='application/json')
+            self.assertEqual(respuesta.status_code, 400)
+        turno.refresh_from_db()
+        self.assertEqual(turno.estado, 'pendiente')
+
+
+class FactibilidadTests(TestCase):
+
+    def test_descuenta_slots_de_turnos_asignados(self):
+        # Un solo día con cuatro slots de 30 minutos (08:00 a 10:00)
+        ConfiguracionCronograma.objects.create(
+            fecha_inicio=date(2026, 10, 19), fecha_fin=date(2026, 10, 19), modo_exclusion='none',
+            hora_inicio=time(8), hora_fin=time(10), duracion_turno=30,
+        )
+        for i, hora in enumerate([time(8), time(8, 30), time(9)]):
+            Turno.objects.create(
+                responsable=Responsable.objects.create(nombre=f"ASIGNADO {i}"),
+                fecha=date(2026, 10, 19), hora=hora, estacion=1, duracion=30, estado='asignado',
+            )
+        for i in range(2):
+            Turno.objects.create(responsable=Responsable.objects.create(nombre=f"PENDIENTE {i}"))
+
+        datos = self.client.get(reverse('factibilidad_configuracion')).json()
+        self.assertEqual((datos['slots_disponibles'], datos['slots_ocupados']), (1, 3))
+        self.assertEqual(datos['faltantes'], 1)
+        self.assertFalse(datos['factible'])
 
-# Create your tests here.
+        asignados, resultado = asignar_turnos_automatico()
+        self.assertEqual(asignados, 0)
+        self.assertEqual(resultado['error_type'], 'insufficient_slots')
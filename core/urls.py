@@ -6,10 +6,17 @@ urlpatterns = [
     path('notificaciones/', views_notifications.notification_manager, name='notification_manager'),
     path('', views.index, name='index'),
     path('upload/', views.upload_excel, name='upload_excel'),
+    path('api/importaciones/<int:trabajo_id>/', views.estado_importacion, name='estado_importacion'),
     path('cronograma/', views.ver_cronograma, name='ver_cronograma'),
     path('config/guardar/', views.guardar_configuracion, name='guardar_configuracion'),
+    path('config/factibilidad/', views.factibilidad_configuracion, name='factibilidad_configuracion'),
     path('cronograma/generar/', views.generar_cronograma_view, name='generar_cronograma'),
     path('turno/<int:turno_id>/actualizar/', views.actualizar_turno, name='actualizar_turno'),
+    path('turno/mover/', views.mover_turnos_lote, name='mover_turnos_lote'),
+    path('api/slots/siguiente/', views.api_slot_libre, name='api_slot_libre'),
+    path('api/carga/', views.api_carga_diaria, name='api_carga_diaria'),
+    path('api/cambios/', views.api_cambios, name='api_cambios'),
+    path('api/eventos/', views.stream_cambios, name='stream_cambios'),
     path('turno/intercambiar/', views.intercambiar_turnos, name='intercambiar_turnos'),
     path('turno/<int:turno_id>/toggle/', views.toggle_completado, name='toggle_completado'),
     path('equipo/<int:equipo_id>/toggle-atendido/', views.toggle_equipo_atendido, name='toggle_equipo_atendido'),
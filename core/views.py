@@ -1,13 +1,29 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.http import JsonResponse
-from django.views.decorators.http import require_POST
-from django.db.models import Count
+from django.core.exceptions import ValidationError
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.core.paginator import Paginator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import require_POST, condition
+from django.db import transaction
+from django.db.models import F
+import asyncio
 import json
 from datetime import datetime, date, timedelta
 from .forms import UploadFileForm
-from .services import procesar_archivo_activos, asignar_turnos_automatico
-from .models import Turno, Responsable, Equipo, ConfiguracionCronograma, Feriado
+from .services import (
+    procesar_archivo_activos, iniciar_trabajo_importacion, asignar_turnos_automatico,
+    capacidad_slots, celdas_ocupadas, slots_ocupados, tamanos_turnos,
+    obtener_feriados, invalidar_cache_feriados,
+    reprogramar_turnos, siguiente_slot_libre, mover_turnos, registrar_cambios,
+    cambios_desde, ultimo_cambio, serializar_turno, serializar_config, columnas_turnos,
+    carga_por_dia, progreso_importacion,
+)
+from .eventos import obtener_difusor, LATIDO_SEGUNDOS
+from .exportacion import generar_exportacion, nombre_archivo, CONTENT_TYPE_XLSX
+from .models import Turno, Responsable, Equipo, ConfiguracionCronograma, Feriado, TrabajoImportacion, VersionDatos
 
 def index(request):
     return redirect('ver_cronograma')
@@ -15,91 +31,223 @@ def index(request):
 def upload_excel(request):
     if request.method == 'POST':
         form = UploadFileForm(request.POST, request.FILES)
+        es_ajax = request.headers.get('x-requested-with') == 'XMLHttpRequest' or request.POST.get('ajax')
         if form.is_valid():
+            incremental = form.cleaned_data.get('modo') == 'incremental'
+            if es_ajax:
+                # Archivos grandes: se procesan en segundo plano y el frontend consulta el progreso
+                try:
+                    trabajo = iniciar_trabajo_importacion(request.FILES['archivo'], incremental=incremental)
+                except Exception as e:
+                    return JsonResponse({'status': 'error', 'message': f"Error al procesar el archivo: {e}"}, status=400)
+                return JsonResponse({
+                    'status': 'ok',
+                    'message': "Archivo recibido. Procesando en segundo plano...",
+                    'trabajo_id': trabajo.id,
+                    'progreso_url': reverse('estado_importacion', args=[trabajo.id]),
+                }, status=202)
             try:
-                procesar_archivo_activos(request.FILES['archivo'])
-                if request.headers.get('x-requested-with') == 'XMLHttpRequest' or request.POST.get('ajax'):
-                    return JsonResponse({'status': 'ok', 'message': "Archivo procesado con éxito."})
-                messages.success(request, "Archivo procesado con éxito.")
+                stats = procesar_archivo_activos(request.FILES['archivo'], incremental=incremental)
+                messages.success(request, _mensaje_importacion(stats, incremental))
                 return redirect('ver_cronograma')
             except Exception as e:
-                if request.headers.get('x-requested-with') == 'XMLHttpRequest' or request.POST.get('ajax'):
-                    return JsonResponse({'status': 'error', 'message': f"Error al procesar el archivo: {e}"}, status=400)
                 messages.error(request, f"Error al procesar el archivo: {e}")
+        elif es_ajax:
+            return JsonResponse({'status': 'error', 'message': "Debe seleccionar un archivo válido."}, status=400)
     return redirect('ver_cronograma')
 
+def _mensaje_importacion(stats, incremental):
+    mensaje = (f"Archivo procesado con éxito: {stats['filas']} filas, "
+               f"{stats['responsables']} responsables ({stats['filas_por_segundo']} filas/s).")
+    if incremental:
+        mensaje += (f" Equipos: {stats['equipos_creados']} nuevos, "
+                    f"{stats['equipos_actualizados']} actualizados, {stats['equipos_eliminados']} eliminados.")
+    return mensaje
+
+def estado_importacion(request, trabajo_id):
+    """
+    Endpoint de sondeo con el progreso de una importación en segundo plano.
+    """
+    trabajo = get_object_or_404(TrabajoImportacion, id=trabajo_id)
+    data = {
+        'id': trabajo.id,
+        'estado': trabajo.estado,
+        'archivo': trabajo.nombre_original,
+        'filas_totales': trabajo.filas_totales,
+        'filas_procesadas': trabajo.filas_procesadas,
+        'filas_por_segundo': trabajo.filas_por_segundo,
+        'errores': trabajo.errores,
+    }
+    if trabajo.estado == 'procesando':
+        # Mientras corre, las filas procesadas se publican en la caché de importaciones
+        data.update(progreso_importacion(trabajo.id) or {})
+    if trabajo.estado == 'completado' and trabajo.resultado:
+        data['message'] = _mensaje_importacion(trabajo.resultado, trabajo.incremental)
+    return JsonResponse(data)
+
+def _leer_fecha(valor):
+    return date.fromisoformat(valor) if valor else None
+
+def _leer_hora(valor):
+    return datetime.strptime(valor[:5], '%H:%M').time() if valor else None
+
+def _version_datos(request, *args, **kwargs):
+    # condition() consulta ETag y Last-Modified por separado: leer la versión una sola vez
+    if not hasattr(request, '_version_datos'):
+        request._version_datos = VersionDatos.get_solo()
+    return request._version_datos
+
+def _etag_datos(request, *args, **kwargs):
+    return f'v{_version_datos(request).version}'
+
+def _modificado_datos(request, *args, **kwargs):
+    return _version_datos(request).actualizado
+
+def _formato_columnar(request):
+    return request.GET.get('formato') == 'columnar'
+
+@gzip_page
+@cache_control(no_cache=True)
+@condition(etag_func=_etag_datos, last_modified_func=_modificado_datos)
 def api_get_datos(request):
     """
     Endpoint para obtener todos los datos necesarios para re-renderizar el cronograma.
+    Admite una ventana de fechas (?desde=&hasta=) y paginación (?pagina=&por_pagina=).
+    Lleva ETag/Last-Modified con la versión de los datos y responde 304 si no cambiaron.
+    Con ?formato=columnar los turnos van en columnas (ver columnas_turnos).
     """
+    try:
+        desde = _leer_fecha(request.GET.get('desde'))
+        hasta = _leer_fecha(request.GET.get('hasta'))
+        por_pagina = min(int(request.GET.get('por_pagina') or 500), 2000)
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': f'Parámetros inválidos: {e}'}, status=400)
+
+    version = _version_datos(request).version
+    # Cursor del registro de cambios, leído antes que los datos: a lo sumo se repite algún cambio
+    cursor = ultimo_cambio()
     config = ConfiguracionCronograma.objects.last()
-    turnos = Turno.objects.select_related('responsable').prefetch_related('responsable__equipos').all()
+    turnos = Turno.objects.select_related('responsable').prefetch_related('responsable__equipos').order_by('fecha', 'hora', 'estacion', 'id')
     feriados = Feriado.objects.all()
+    if desde:
+        turnos = turnos.filter(fecha__gte=desde)
+        feriados = feriados.filter(fecha__gte=desde)
+    if hasta:
+        turnos = turnos.filter(fecha__lte=hasta)
+        feriados = feriados.filter(fecha__lte=hasta)
+
+    paginacion = None
+    if request.GET.get('pagina'):
+        paginator = Paginator(turnos, max(por_pagina, 1))
+        pagina = paginator.get_page(request.GET['pagina'])
+        turnos = pagina.object_list
+        paginacion = {'pagina': pagina.number, 'paginas': paginator.num_pages, 'total': paginator.count}
     
-    turnos_data = []
-    for t in turnos:
-        turnos_data.append({
-            'id': t.id,
-            'responsable': t.responsable.nombre,
-            'fecha': t.fecha.strftime('%Y-%m-%d') if t.fecha else '',
-            'hora': t.hora.strftime('%H:%M') if t.hora else '',
-            'estado': t.estado,
-            'equipos': [{
-                'id': e.id,
-                'marca': e.marca,
-                'modelo': e.modelo,
-                'codigo': e.codigo,
-                'descripcion': e.descripcion,
-                'atendido': e.atendido
-            } for e in t.responsable.equipos.all()]
-        })
+    if _formato_columnar(request):
+        turnos_data = columnas_turnos(turnos)
+    else:
+        turnos_data = [serializar_turno(t) for t in turnos]
 
     data = {
+        'version': version,
+        'cursor': cursor,
         'turnos': turnos_data,
         'feriados': [f.fecha.strftime('%Y-%m-%d') for f in feriados],
-        'config': {
-            'inicio': config.fecha_inicio.strftime('%Y-%m-%d') if config and config.fecha_inicio else '',
-            'fin': config.fecha_fin.strftime('%Y-%m-%d') if config and config.fecha_fin else '',
-        }
+        'config': serializar_config(config),
     }
+    if paginacion:
+        data['paginacion'] = paginacion
     return JsonResponse(data)
 
+@gzip_page
 def get_day_shifts(request, date):
     """
     Endpoint para obtener todos los turnos de un día específico.
+    Admite ?formato=columnar como api_get_datos.
     """
     turnos = Turno.objects.filter(fecha=date).select_related('responsable').prefetch_related('responsable__equipos').all()
     
-    turnos_data = []
+    # Agrupar por estación para mostrar los turnos paralelos de cada hora
+    por_estacion = {}
     for t in turnos:
-        turnos_data.append({
-            'id': t.id,
-            'responsable': t.responsable.nombre,
-            'fecha': t.fecha.strftime('%Y-%m-%d') if t.fecha else '',
-            'hora': t.hora.strftime('%H:%M') if t.hora else '',
-            'estado': t.estado,
-            'equipos': [{
-                'id': e.id,
-                'marca': e.marca,
-                'modelo': e.modelo,
-                'codigo': e.codigo,
-                'descripcion': e.descripcion,
-                'atendido': e.atendido
-            } for e in t.responsable.equipos.all()]
-        })
-    
-    return JsonResponse({'turnos': turnos_data, 'fecha': date})
+        por_estacion.setdefault(t.estacion, []).append(t.id)
+
+    if _formato_columnar(request):
+        turnos_data = columnas_turnos(turnos)
+    else:
+        turnos_data = [serializar_turno(t) for t in turnos]
+
+    return JsonResponse({'turnos': turnos_data, 'fecha': date, 'por_estacion': por_estacion})
+
+@cache_control(no_cache=True)
+@condition(etag_func=_etag_datos, last_modified_func=_modificado_datos)
+def api_carga_diaria(request):
+    """
+    Resumen por día para el mapa de calor del calendario: turnos por estado
+    y equipos totales/atendidos entre ?desde= y ?hasta= (una sola consulta).
+    """
+    try:
+        desde = _leer_fecha(request.GET.get('desde'))
+        hasta = _leer_fecha(request.GET.get('hasta'))
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': f'Parámetros inválidos: {e}'}, status=400)
+
+    return JsonResponse({
+        'version': _version_datos(request).version,
+        'desde': desde.strftime('%Y-%m-%d') if desde else None,
+        'hasta': hasta.strftime('%Y-%m-%d') if hasta else None,
+        'dias': carga_por_dia(desde, hasta),
+    })
+
+def api_cambios(request):
+    """
+    Cambios del cronograma posteriores al cursor ?desde=N (ver cambios_desde).
+    """
+    try:
+        desde = int(request.GET.get('desde', 0))
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Cursor inválido'}, status=400)
+    return JsonResponse({'status': 'ok', **cambios_desde(desde)})
+
+async def stream_cambios(request):
+    """
+    Canal Server-Sent Events con los cambios del cronograma a medida que se
+    confirman. Cada evento "cambios" trae el mismo contenido que api_cambios
+    más el cursor "desde" sobre el que se calculó. Pensado para servirse por
+    ASGI (gestion_activos/asgi.py): con WSGI cada conexión ocupa un hilo.
+    """
+    difusor = obtener_difusor()
+    cola = difusor.suscribir()
+
+    async def eventos():
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                try:
+                    datos = await asyncio.wait_for(cola.get(), LATIDO_SEGUNDOS)
+                    yield f'event: cambios\ndata: {datos}\n\n'
+                except asyncio.TimeoutError:
+                    # Comentario SSE para que proxies y navegador no cierren la conexión
+                    yield ': latido\n\n'
+        finally:
+            difusor.desuscribir(cola)
+
+    response = StreamingHttpResponse(eventos(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 def ver_cronograma(request):
     config = ConfiguracionCronograma.objects.last()
     turnos = Turno.objects.select_related('responsable').prefetch_related('responsable__equipos').all()
     feriados = Feriado.objects.all()
     
-    # Datos para el sidebar
-    responsables_stats = Responsable.objects.annotate(num_equipos=Count('equipos'))
+    # Datos para el sidebar (num_equipos es un contador mantenido)
+    responsables_stats = Responsable.objects.all()
     
     context = {
         'config': config,
+        'cursor': ultimo_cambio(),
         'turnos': turnos,
         'feriados': feriados,
         'responsables': responsables_stats,
@@ -107,6 +255,24 @@ def ver_cronograma(request):
     }
     return render(request, 'core/cronograma.html', context)
 
+CAMPOS_CONFIGURACION = [
+    'fecha_inicio', 'fecha_fin', 'hora_inicio', 'hora_fin', 'hora_almuerzo',
+    'duracion_turno', 'duracion_almuerzo', 'modo_exclusion', 'estaciones', 'modo_duracion',
+]
+
+def _aplicar_configuracion(config, data):
+    """
+    Copia en `config` los campos enviados en `data`, convertidos al tipo del modelo.
+    Los campos vacíos conservan su valor actual.
+    """
+    for campo in CAMPOS_CONFIGURACION:
+        if data.get(campo):
+            try:
+                setattr(config, campo, config._meta.get_field(campo).to_python(data.get(campo)))
+            except ValidationError as e:
+                raise ValueError(f"{campo}: {' '.join(e.messages)}")
+    return config
+
 @require_POST
 def guardar_configuracion(request):
     data = request.POST
@@ -114,23 +280,7 @@ def guardar_configuracion(request):
         config, created = ConfiguracionCronograma.objects.get_or_create(id=1)
         
         # Asignar valores directamente (los campos ahora aceptan null)
-        if data.get('fecha_inicio'):
-            config.fecha_inicio = data.get('fecha_inicio')
-        if data.get('fecha_fin'):
-            config.fecha_fin = data.get('fecha_fin')
-        if data.get('hora_inicio'):
-            config.hora_inicio = data.get('hora_inicio')
-        if data.get('hora_fin'):
-            config.hora_fin = data.get('hora_fin')
-        if data.get('hora_almuerzo'):
-            config.hora_almuerzo = data.get('hora_almuerzo')
-        if data.get('duracion_turno'):
-            config.duracion_turno = int(data.get('duracion_turno'))
-        if data.get('duracion_almuerzo'):
-            config.duracion_almuerzo = int(data.get('duracion_almuerzo'))
-        
-        if data.get('modo_exclusion'):
-            config.modo_exclusion = data.get('modo_exclusion')
+        _aplicar_configuracion(config, data)
         
         if data.get('fecha_inicio') and data.get('fecha_fin'):
             if data.get('fecha_inicio') > data.get('fecha_fin'):
@@ -140,13 +290,51 @@ def guardar_configuracion(request):
                 }, status=400)
 
         config.save()
-        return JsonResponse({'status': 'ok', 'message': 'Configuración guardada correctamente'})
+        registrar_cambios('config')
+        reprogramacion = reprogramar_turnos()
+        return JsonResponse({
+            'status': 'ok',
+            'message': 'Configuración guardada correctamente' + _mensaje_reprogramacion(reprogramacion),
+            'reprogramacion': reprogramacion,
+        })
     except Exception as e:
         import traceback
         error_detail = traceback.format_exc()
         print(f"Error en guardar_configuracion: {error_detail}")
         return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
 
+def factibilidad_configuracion(request):
+    """
+    Calcula, sin guardar nada, la capacidad de una configuración candidata
+    (mismos campos que guardar_configuracion, por GET) frente a los turnos pendientes.
+    Los slots que ya ocupan los turnos asignados no cuentan como disponibles.
+    """
+    try:
+        config = ConfiguracionCronograma.objects.last() or ConfiguracionCronograma()
+        _aplicar_configuracion(config, request.GET)
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+    if not config.fecha_inicio or not config.fecha_fin:
+        return JsonResponse({'status': 'error', 'message': 'La configuración debe incluir fechas de inicio y fin.'}, status=400)
+
+    feriados = obtener_feriados()
+    slots, dias = capacidad_slots(config, feriados)
+    ocupados = slots_ocupados(config, celdas_ocupadas(config), feriados) if slots else 0
+    slots -= ocupados
+    cantidades = list(Turno.objects.filter(estado='pendiente').values_list('responsable__num_equipos', flat=True))
+    requeridos = sum(tamanos_turnos(config, cantidades))
+    return JsonResponse({
+        'status': 'ok',
+        'slots_disponibles': slots,
+        'slots_ocupados': ocupados,
+        'dias_laborables': dias,
+        'turnos_pendientes': len(cantidades),
+        'slots_requeridos': requeridos,
+        'faltantes': max(requeridos - slots, 0),
+        'factible': slots >= requeridos,
+    })
+
 @require_POST
 def generar_cronograma_view(request):
     try:
@@ -165,25 +353,89 @@ def generar_cronograma_view(request):
             'data': {'message': f'Error interno del servidor: {str(e)}'}
         }, status=500)
 
+def _mensaje_conflicto(conflicto):
+    if conflicto['motivo'] == 'ocupado':
+        mensaje = 'El horario elegido ya está ocupado'
+    else:
+        mensaje = 'El horario elegido no es un turno válido (día no laborable, fuera de horario o almuerzo)'
+    sugerencia = conflicto['sugerencia']
+    if sugerencia:
+        mensaje += f". Próximo libre: {sugerencia['fecha']} {sugerencia['hora']} (estación {sugerencia['estacion']})"
+    return mensaje
+
+def api_slot_libre(request):
+    """
+    Próximo slot libre desde ?fecha=&hora= (por defecto, hoy). Con ?turno_id=
+    se busca un hueco del largo de ese turno, ignorando su lugar actual.
+    """
+    try:
+        fecha = _leer_fecha(request.GET.get('fecha')) or date.today()
+        hora = _leer_hora(request.GET.get('hora')) or datetime.min.time()
+        estacion = int(request.GET['estacion']) if request.GET.get('estacion') else None
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': f'Parámetros inválidos: {e}'}, status=400)
+
+    num_slots, excluir = 1, ()
+    if request.GET.get('turno_id'):
+        turno = get_object_or_404(Turno, id=request.GET['turno_id'])
+        config = ConfiguracionCronograma.objects.last()
+        if turno.duracion and config:
+            num_slots = max(-(-turno.duracion // config.duracion_turno), 1)
+        excluir = [turno.id]
+
+    slot = siguiente_slot_libre(fecha, hora, num_slots, estacion, excluir)
+    if not slot:
+        return JsonResponse({'status': 'error', 'message': 'No hay slots libres en el período configurado'}, status=404)
+    return JsonResponse({'status': 'ok', **slot})
+
 @require_POST
 def actualizar_turno(request, turno_id):
+    """
+    Cambia fecha/hora/estación y/o estado de un turno. Los cambios de lugar se
+    validan contra la ocupación: un destino ocupado o inválido se rechaza con
+    409 y una sugerencia, o con "resolver": true se usa el próximo slot libre
+    de ese mismo día.
+    """
     turno = get_object_or_404(Turno, id=turno_id)
     data = json.loads(request.body)
-    
-    if 'fecha' in data:
-        turno.fecha = data['fecha']
-    if 'hora' in data:
-        turno.hora = data['hora']
-    if 'estado' in data:
-        turno.estado = data['estado']
-        
-    turno.save()
-    return JsonResponse({'status': 'ok'})
+    estado = data.get('estado')
+    if estado and estado not in dict(Turno.ESTADO_CHOICES):
+        return JsonResponse({'status': 'error', 'message': f'Datos inválidos: estado "{estado}"'}, status=400)
+
+    if any(campo in data for campo in ('fecha', 'hora', 'estacion')):
+        try:
+            fecha = _leer_fecha(data['fecha']) if 'fecha' in data else turno.fecha
+            hora = _leer_hora(data['hora']) if 'hora' in data else turno.hora
+            estacion = int(data['estacion']) if 'estacion' in data else turno.estacion
+        except (TypeError, ValueError) as e:
+            return JsonResponse({'status': 'error', 'message': f'Datos inválidos: {e}'}, status=400)
+
+        # mover_turnos también recalcula notificar_el y descarta los recordatorios con la hora vieja
+        _, conflictos = mover_turnos(
+            [(turno, fecha, hora, estacion, estado)], resolver=bool(data.get('resolver'))
+        )
+        if conflictos:
+            return JsonResponse({
+                'status': 'error', 'message': _mensaje_conflicto(conflictos[0]), 'conflictos': conflictos
+            }, status=409)
+    elif estado:
+        turno.estado = estado
+        turno.save()
+        registrar_cambios('turno', [turno.id])
+
+    return JsonResponse({
+        'status': 'ok',
+        'fecha': turno.fecha.strftime('%Y-%m-%d') if turno.fecha else '',
+        'hora': turno.hora.strftime('%H:%M') if turno.hora else '',
+        'estacion': turno.estacion,
+    })
 
 @require_POST
 def intercambiar_turnos(request):
     """
-    Intercambia la fecha y hora de dos turnos específicos.
+    Intercambia la fecha, hora y estación de dos turnos específicos.
+    Si los turnos tienen distinta duración, el intercambio se valida contra la
+    ocupación igual que en actualizar_turno.
     """
     try:
         data = json.loads(request.body)
@@ -193,23 +445,86 @@ def intercambiar_turnos(request):
         if not turno_a_id or not turno_b_id:
             return JsonResponse({'status': 'error', 'message': 'IDs de turno no proporcionados'}, status=400)
             
-        from django.db import transaction
-        with transaction.atomic():
-            turno_a = get_object_or_404(Turno, id=turno_a_id)
-            turno_b = get_object_or_404(Turno, id=turno_b_id)
-            
-            # Intercambiar fecha y hora
-            fecha_temp, hora_temp = turno_a.fecha, turno_a.hora
-            turno_a.fecha, turno_a.hora = turno_b.fecha, turno_b.hora
-            turno_b.fecha, turno_b.hora = fecha_temp, hora_temp
-            
-            turno_a.save()
-            turno_b.save()
-            
+        turno_a = get_object_or_404(Turno, id=turno_a_id)
+        turno_b = get_object_or_404(Turno, id=turno_b_id)
+
+        # Intercambiar fecha, hora y estación (mover_turnos actualiza también los recordatorios)
+        _, conflictos = mover_turnos([
+            (turno_a, turno_b.fecha, turno_b.hora, turno_b.estacion, None),
+            (turno_b, turno_a.fecha, turno_a.hora, turno_a.estacion, None),
+        ], resolver=bool(data.get('resolver')))
+        if conflictos:
+            return JsonResponse({
+                'status': 'error', 'message': _mensaje_conflicto(conflictos[0]), 'conflictos': conflictos
+            }, status=409)
+
         return JsonResponse({'status': 'ok', 'message': 'Turnos intercambiados correctamente'})
     except Exception as e:
         return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
 
+@require_POST
+def mover_turnos_lote(request):
+    """
+    Aplica varios movimientos del calendario en una sola petición:
+    {"movimientos": [{"turno_id", "fecha", "hora", "estacion", "estado"}, ...], "resolver": false}.
+    Los movimientos se validan entre sí (p. ej. dos turnos que intercambian
+    lugar) y se guardan todos juntos o ninguno.
+    """
+    try:
+        data = json.loads(request.body)
+        movimientos = data.get('movimientos') or []
+        ids = [int(m['turno_id']) for m in movimientos]
+    except (ValueError, TypeError, KeyError) as e:
+        return JsonResponse({'status': 'error', 'message': f'Datos inválidos: {e}'}, status=400)
+
+    if not movimientos:
+        return JsonResponse({'status': 'error', 'message': 'No se enviaron movimientos'}, status=400)
+    if len(set(ids)) != len(ids):
+        return JsonResponse({'status': 'error', 'message': 'Un turno aparece más de una vez en el lote'}, status=400)
+
+    turnos = Turno.objects.in_bulk(ids)
+    faltantes = [i for i in ids if i not in turnos]
+    if faltantes:
+        return JsonResponse({'status': 'error', 'message': f'Turnos inexistentes: {faltantes}'}, status=404)
+
+    estados_validos = dict(Turno.ESTADO_CHOICES)
+    lote = []
+    try:
+        for m, turno_id in zip(movimientos, ids):
+            turno = turnos[turno_id]
+            estado = m.get('estado')
+            if estado and estado not in estados_validos:
+                raise ValueError(f'estado "{estado}"')
+            lote.append((
+                turno,
+                _leer_fecha(m['fecha']) if 'fecha' in m else turno.fecha,
+                _leer_hora(m['hora']) if 'hora' in m else turno.hora,
+                int(m['estacion']) if 'estacion' in m else turno.estacion,
+                estado,
+            ))
+    except (TypeError, ValueError) as e:
+        return JsonResponse({'status': 'error', 'message': f'Datos inválidos: {e}'}, status=400)
+
+    actualizados, conflictos = mover_turnos(lote, resolver=bool(data.get('resolver')))
+    if conflictos:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'{len(conflictos)} movimientos en conflicto. ' + _mensaje_conflicto(conflictos[0]),
+            'conflictos': conflictos,
+        }, status=409)
+
+    return JsonResponse({
+        'status': 'ok',
+        'message': f'{len(actualizados)} turnos actualizados',
+        'turnos': [{
+            'id': t.id,
+            'fecha': t.fecha.strftime('%Y-%m-%d') if t.fecha else '',
+            'hora': t.hora.strftime('%H:%M') if t.hora else '',
+            'estacion': t.estacion,
+            'estado': t.estado,
+        } for t in actualizados],
+    })
+
 @require_POST
 def toggle_completado(request, turno_id):
     turno = get_object_or_404(Turno, id=turno_id)
@@ -219,8 +534,11 @@ def toggle_completado(request, turno_id):
         turno.estado = 'completado'
         # Si se marca como completado, marcar todos sus equipos como atendidos
         turno.responsable.equipos.update(atendido=True)
+        Responsable.objects.filter(id=turno.responsable_id).update(num_atendidos=F('num_equipos'))
+        registrar_cambios('equipo', turno.responsable.equipos.values_list('id', flat=True))
         
     turno.save()
+    registrar_cambios('turno', [turno.id])
     
     # Devolver el estado de los equipos para actualizar el panel lateral
     equipos_data = list(turno.responsable.equipos.values('id', 'atendido'))
@@ -233,14 +551,19 @@ def toggle_completado(request, turno_id):
 
 @require_POST
 def toggle_equipo_atendido(request, equipo_id):
-    equipo = get_object_or_404(Equipo, id=equipo_id)
-    equipo.atendido = not equipo.atendido
-    equipo.save()
+    with transaction.atomic():
+        # El bloqueo evita que dos clics simultáneos desfasen el contador
+        equipo = get_object_or_404(Equipo.objects.select_for_update(), id=equipo_id)
+        equipo.atendido = not equipo.atendido
+        equipo.save(update_fields=['atendido'])
+        Responsable.objects.filter(id=equipo.responsable_id).update(
+            num_atendidos=F('num_atendidos') + (1 if equipo.atendido else -1)
+        )
     
-    # Calcular estadísticas del responsable
-    responsable = equipo.responsable
-    total_equipos = responsable.equipos.count()
-    equipos_atendidos = responsable.equipos.filter(atendido=True).count()
+    # Estadísticas del responsable (contadores ya actualizados)
+    responsable = Responsable.objects.get(id=equipo.responsable_id)
+    total_equipos = responsable.num_equipos
+    equipos_atendidos = responsable.num_atendidos
     
     # Sincronizar con el estado del Turno
     turno = getattr(responsable, 'turno', None)
@@ -252,6 +575,8 @@ def toggle_equipo_atendido(request, equipo_id):
         else:
             turno.estado = 'asignado'
         turno.save()
+        registrar_cambios('turno', [turno.id])
+    registrar_cambios('equipo', [equipo.id])
     
     return JsonResponse({
         'status': 'ok',
@@ -261,14 +586,30 @@ def toggle_equipo_atendido(request, equipo_id):
         'turno_estado': turno.estado if turno else None
     })
 
+def _mensaje_reprogramacion(reprogramacion):
+    mensaje = ''
+    if reprogramacion['movidos']:
+        mensaje += f". {reprogramacion['movidos']} turnos reprogramados"
+    if reprogramacion['sin_lugar']:
+        mensaje += f". {reprogramacion['sin_lugar']} turnos sin lugar volvieron a pendiente"
+    return mensaje
+
 @require_POST
 def add_feriado(request):
     data = json.loads(request.body)
     fecha = data.get('fecha')
     if fecha:
         Feriado.objects.get_or_create(fecha=fecha)
+        invalidar_cache_feriados()
+        registrar_cambios('feriado')
+        reprogramacion = reprogramar_turnos()
         feriados = list(Feriado.objects.values_list('fecha', flat=True))
-        return JsonResponse({'status': 'ok', 'feriados': [f.strftime('%Y-%m-%d') for f in feriados]})
+        return JsonResponse({
+            'status': 'ok',
+            'feriados': [f.strftime('%Y-%m-%d') for f in feriados],
+            'message': 'Feriado añadido' + _mensaje_reprogramacion(reprogramacion),
+            'reprogramacion': reprogramacion,
+        })
     return JsonResponse({'status': 'error', 'message': 'Fecha inválida'}, status=400)
 
 @require_POST
@@ -277,143 +618,25 @@ def remove_feriado(request):
     fecha = data.get('fecha')
     if fecha:
         Feriado.objects.filter(fecha=fecha).delete()
+        invalidar_cache_feriados()
+        registrar_cambios('feriado')
         feriados = list(Feriado.objects.values_list('fecha', flat=True))
         return JsonResponse({'status': 'ok', 'feriados': [f.strftime('%Y-%m-%d') for f in feriados]})
     return JsonResponse({'status': 'error', 'message': 'Fecha inválida'}, status=400)
 
-def exportar_excel(request):
-    import io
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-    from django.http import HttpResponse
-    from datetime import datetime
-
-    # 1. Obtener Datos (Incluir turnos asignados, en proceso y completados)
-    turnos = Turno.objects.filter(estado__in=['asignado', 'en_proceso', 'completado']).select_related('responsable').prefetch_related('responsable__equipos')
-    
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Cronograma de Mantenimiento"
-
-    # 2. Definir Estilos
-    header_fill = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid") # Azul oscuro
-    header_font = Font(color="FFFFFF", bold=True, size=11)
-    
-    success_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid") # Verde claro
-    success_font = Font(color="006100", bold=True)
-    process_fill = PatternFill(start_color="FFF2CC", end_color="FFF2CC", fill_type="solid") # Amarillo claro
-    process_font = Font(color="9C5700", bold=True)
-    
-    info_fill = PatternFill(start_color="DDEBF7", end_color="DDEBF7", fill_type="solid") # Azul claro
-    
-    border = Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin'))
-    center_align = Alignment(horizontal="center", vertical="center")
-    left_align = Alignment(horizontal="left", vertical="center")
-
-    # 3. Encabezado del Reporte
-    ws.merge_cells('A1:F1')
-    ws['A1'] = "SISTEMA TECHSCHEDULER - CRONOGRAMA DE MANTENIMIENTO PREVENTIVO"
-    ws['A1'].font = Font(bold=True, size=14, color="1F4E78")
-    ws['A1'].alignment = center_align
-
-    # 4. Resumen Ejecutivo
-    total = turnos.count()
-    completados = turnos.filter(estado='completado').count()
-    pendientes = total - completados
-    
-    ws['A3'] = "RESUMEN DE EJECUCIÓN"
-    ws['A3'].font = Font(bold=True, size=10, underline="single")
-    
-    ws['A4'] = "Total Responsables:"; ws['B4'] = total
-    ws['A5'] = "Mantenimientos Listos:"; ws['B5'] = completados; ws['B5'].font = success_font
-    ws['A6'] = "Mantenimientos Pendientes:"; ws['B6'] = pendientes; ws['B6'].font = Font(color="9C0006", bold=True)
-    
-    ws['D4'] = "Fecha Reporte:"; ws['E4'] = datetime.now().strftime("%d/%m/%Y %H:%M")
-    ws.merge_cells('D4:E4')
+def _etag_exportacion(request, *args, **kwargs):
+    return f'xlsx-v{_version_datos(request).version}'
 
-    # 5. Tabla de Datos
-    headers = ['FECHA', 'HORA', 'RESPONSABLE', 'EQUIPOS', 'ESTADO', 'DETALLE TÉCNICO (MARCA, MODELO, ID)']
-    
-    start_row = 8
-    for i, h in enumerate(headers):
-        cell = ws.cell(row=start_row, column=i+1)
-        cell.value = h
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = center_align
-        cell.border = border
-
-    # 6. Llenado de Datos
-    current_row = start_row + 1
-    for t in turnos:
-        # Fecha y Hora
-        c_fecha = ws.cell(row=current_row, column=1, value=t.fecha)
-        c_fecha.alignment = center_align
-        c_fecha.number_format = 'DD/MM/YYYY'
-        
-        ws.cell(row=current_row, column=2, value=t.hora.strftime("%H:%M") if t.hora else "--:--").alignment = center_align
-        
-        # Responsable
-        ws.cell(row=current_row, column=3, value=t.responsable.nombre).alignment = left_align
-        
-        # Equipos (conteo)
-        eq_all = t.responsable.equipos.all()
-        eq_count = eq_all.count()
-        atendidos = eq_all.filter(atendido=True).count()
-        ws.cell(row=current_row, column=4, value=f"{atendidos}/{eq_count}").alignment = center_align
-        
-        # Estado con Color
-        if t.estado == 'completado':
-            status_text = "LISTO"
-        elif t.estado == 'en_proceso' or (atendidos > 0 and atendidos < eq_count):
-            status_text = "EN PROCESO"
-        else:
-            status_text = "PENDIENTE"
-            
-        status_cell = ws.cell(row=current_row, column=5, value=status_text)
-        status_cell.alignment = center_align
-        
-        if status_text == 'LISTO':
-            status_cell.fill = success_fill
-            status_cell.font = success_font
-        elif status_text == 'EN PROCESO':
-            # Amarillo más potente
-            status_cell.fill = PatternFill(start_color="FFD966", end_color="FFD966", fill_type="solid")
-            status_cell.font = Font(color="9C5700", bold=True)
-        else:
-            status_cell.fill = info_fill
-            status_cell.font = Font(color="0070C0", bold=True)
-        
-        # Detalle granular por equipo (Incluye ID GOBIERNO)
-        detalles_lista = []
-        for eq in eq_all:
-            lbl = "[LISTO]" if eq.atendido else "[PENDIENTE]"
-            id_str = f"({eq.codigo})" if eq.codigo else "(S/N)"
-            detalles_lista.append(f"{lbl} {eq.marca} {eq.modelo} {id_str}")
-            
-        detalles_full = " | ".join(detalles_lista)
-        ws.cell(row=current_row, column=6, value=detalles_full).alignment = left_align
-        ws.cell(row=current_row, column=6).font = Font(size=8)
-        
-        # Bordes
-        for col in range(1, 7):
-            ws.cell(row=current_row, column=col).border = border
-            
-        current_row += 1
-
-    # 7. Ajuste de Estética Final
-    ws.column_dimensions['A'].width = 13
-    ws.column_dimensions['B'].width = 8
-    ws.column_dimensions['C'].width = 30
-    ws.column_dimensions['D'].width = 10
-    ws.column_dimensions['E'].width = 15
-    ws.column_dimensions['F'].width = 85
-
-    output = io.BytesIO()
-    wb.save(output)
-    response = HttpResponse(output.getvalue(), content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    response['Content-Disposition'] = f'attachment; filename=Cronograma_Mantenimiento_{datetime.now().strftime("%Y%m%d")}.xlsx'
-    return response
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_etag_exportacion, last_modified_func=_modificado_datos)
+def exportar_excel(request):
+    """
+    Descarga el cronograma en Excel. Se sirve el libro guardado para la
+    versión actual de los datos (ver core/exportacion.py); si todavía no
+    existe se genera en esta petición. Responde 304 si el cliente ya lo tiene.
+    """
+    ruta = generar_exportacion(_version_datos(request).version)
+    return FileResponse(open(ruta, 'rb'), as_attachment=True, filename=nombre_archivo(), content_type=CONTENT_TYPE_XLSX)
 
 @require_POST
 def reset_database(request):
@@ -428,6 +651,9 @@ def reset_database(request):
             Responsable.objects.all().delete()
             Feriado.objects.all().delete()
             ConfiguracionCronograma.objects.all().delete()
+            # La versión no se reinicia: un ETag viejo nunca debe volver a ser válido
+            registrar_cambios('reset')
+        invalidar_cache_feriados()
         return JsonResponse({'status': 'ok', 'message': 'Sistema reiniciado correctamente.'})
     except Exception as e:
         return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
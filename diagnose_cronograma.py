@@ -7,7 +7,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gestion_activos.settings')
 django.setup()
 
 from core.models import ConfiguracionCronograma, Turno, Responsable, Feriado
-from core.services import generar_slots
+from core.services import generar_slots_compactos
 
 def diagnose():
     config = ConfiguracionCronograma.objects.last()
@@ -36,9 +36,9 @@ def diagnose():
     print(f"  - Turnos Completados: {completados}")
 
     if config.fecha_inicio and config.fecha_fin:
-        slots = generar_slots(config)
+        slots = generar_slots_compactos(config)
         print(f"DIAGNOSTIC: Slots")
-        print(f"  - Slots generated: {len(slots)}")
+        print(f"  - Slots generated: {len(slots)} ({slots.num_dias} working days x {len(slots.minutos)} per day x {slots.estaciones} stations)")
         if len(slots) < pendientes:
             print(f"  - PROBLEM: Insufficient slots! Need {pendientes}, have {len(slots)}.")
         else:
@@ -5,6 +5,12 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
+
+The live schedule feed (core.views.stream_cambios, Server-Sent Events) is an
+async streaming view: serve the project through this entry point, e.g.
+``gunicorn gestion_activos.asgi:application -k uvicorn_worker.UvicornWorker``
+(see render.yaml), so each open stream costs a coroutine instead of a
+worker thread.
 """
 
 import os
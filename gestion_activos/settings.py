@@ -14,6 +14,7 @@ from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 import os
+import tempfile
 import dj_database_url
 from dotenv import load_dotenv
 
@@ -82,10 +83,14 @@ WSGI_APPLICATION = 'gestion_activos.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
+# Bajo ASGI cada petición corre su código síncrono en un hilo propio: con
+# conexiones persistentes cada hilo dejaría la suya abierta. Por defecto se
+# cierran al terminar cada petición (CONN_MAX_AGE=0).
 DATABASES = {
     'default': dj_database_url.config(
         default='sqlite:///db.sqlite3',
-        conn_max_age=600
+        conn_max_age=int(os.environ.get('CONN_MAX_AGE', 0)),
+        conn_health_checks=True
     )
 }
 
@@ -126,6 +131,24 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Archivos subidos (importaciones en segundo plano)
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# 'default' es local a cada proceso. El progreso de las importaciones en segundo
+# plano se consulta desde cualquier worker, así que va en una caché en disco
+# compartida por los procesos del servidor.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'importaciones': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get(
+            'CACHE_IMPORTACIONES_DIR', os.path.join(tempfile.gettempdir(), 'gestion_activos_importaciones')
+        ),
+    },
+}
+
 if not DEBUG:
     STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
     STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
@@ -141,3 +164,14 @@ EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', EMAIL_HOST_USER)
 
+
+# Envío concurrente de la cola de notificaciones: hilos (y conexiones SMTP) por ejecución.
+# Por defecto uno (secuencial); con SQLite se usa siempre uno, porque sus escrituras
+# desde varios hilos a la vez terminan en "database is locked"
+NOTIFICACIONES_HILOS_ENVIO = int(os.environ.get('NOTIFICACIONES_HILOS_ENVIO', 1))
+# Cada trabajador reclama ítems de la cola por lotes; el reclamo vence a los N segundos
+NOTIFICACIONES_LOTE_RECLAMO = int(os.environ.get('NOTIFICACIONES_LOTE_RECLAMO', 5))
+NOTIFICACIONES_RECLAMO_SEGUNDOS = int(os.environ.get('NOTIFICACIONES_RECLAMO_SEGUNDOS', 300))
+# Reintentos de la cola: espera exponencial desde BASE segundos (con jitter), tope MAX segundos
+NOTIFICACIONES_REINTENTO_BASE_SEGUNDOS = int(os.environ.get('NOTIFICACIONES_REINTENTO_BASE_SEGUNDOS', 60))
+NOTIFICACIONES_REINTENTO_MAX_SEGUNDOS = int(os.environ.get('NOTIFICACIONES_REINTENTO_MAX_SEGUNDOS', 3600))
@@ -0,0 +1,50 @@
+# Generated by Django 6.0.1 on 2026-10-18 04:11
+
+from django.db import migrations, models
+
+
+def eliminar_duplicados(apps, schema_editor):
+    """
+    Deja una sola fila por (turno, tipo) antes de crear la restricción: la
+    enviada si la hay, si no la más reciente. El historial y la auditoría de
+    las duplicadas pasan a la que se conserva.
+    """
+    NotificacionEncolada = apps.get_model('notifications', 'NotificacionEncolada')
+    HistorialEnvio = apps.get_model('notifications', 'HistorialEnvio')
+    AuditLogNotificaciones = apps.get_model('notifications', 'AuditLogNotificaciones')
+
+    conservadas = {}
+    duplicadas = {}
+    filas = NotificacionEncolada.objects.filter(turno__isnull=False).order_by(
+        'turno_id', 'tipo', models.Case(models.When(estado='enviado', then=0), default=1), '-fecha_creacion'
+    ).values_list('id', 'turno_id', 'tipo')
+    for id_, turno_id, tipo in filas:
+        clave = (turno_id, tipo)
+        if clave in conservadas:
+            duplicadas[id_] = conservadas[clave]
+        else:
+            conservadas[clave] = id_
+
+    for duplicada, conservada in duplicadas.items():
+        HistorialEnvio.objects.filter(notificacion_id=duplicada).update(notificacion_id=conservada)
+        AuditLogNotificaciones.objects.filter(notificacion_id=duplicada).update(notificacion_id=conservada)
+    NotificacionEncolada.objects.filter(id__in=list(duplicadas)).delete()
+
+
+class Migration(migrations.Migration):
+    # En PostgreSQL no se puede alterar la tabla en la misma transacción que
+    # borró filas con claves foráneas diferidas: la limpieza va en la suya.
+    atomic = False
+
+    dependencies = [
+        ('core', '0016_responsable_num_atendidos_responsable_num_equipos'),
+        ('notifications', '0007_remove_configuracionnotificacion_asunto_inicio_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(eliminar_duplicados, migrations.RunPython.noop, atomic=True),
+        migrations.AddConstraint(
+            model_name='notificacionencolada',
+            constraint=models.UniqueConstraint(fields=('turno', 'tipo'), name='notificacion_unica_por_turno_tipo'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0.1 on 2026-10-18 04:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0008_notificacionencolada_notificacion_unica_por_turno_tipo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificacionencolada',
+            name='reclamado_el',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='notificacionencolada',
+            name='reclamo_expira',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='notificacionencolada',
+            name='trabajador',
+            field=models.CharField(blank=True, max_length=120, verbose_name='Trabajador'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-18 04:35
+
+from django.db import migrations, models
+
+
+def inicializar_proximo_intento(apps, schema_editor):
+    """Las filas existentes pueden intentarse desde su fecha programada."""
+    NotificacionEncolada = apps.get_model('notifications', 'NotificacionEncolada')
+    NotificacionEncolada.objects.filter(proximo_intento__isnull=True).update(
+        proximo_intento=models.F('fecha_programada')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0009_notificacionencolada_reclamado_el_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificacionencolada',
+            name='proximo_intento',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(inicializar_proximo_intento, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='notificacionencolada',
+            index=models.Index(fields=['estado', 'proximo_intento'], name='notificacion_estado_proximo'),
+        ),
+    ]
@@ -82,6 +82,14 @@ class NotificacionEncolada(models.Model):
     max_intentos = models.PositiveIntegerField(default=3)
     
     ultimo_error = models.TextField(blank=True)
+    # Cuándo puede volver a intentarse: fecha_programada al encolar, luego con espera exponencial tras cada error
+    proximo_intento = models.DateTimeField(null=True, blank=True)
+
+    # Reclamo (lease) del trabajador que lo está enviando; vence en reclamo_expira
+    trabajador = models.CharField(max_length=120, blank=True, verbose_name="Trabajador")
+    reclamado_el = models.DateTimeField(null=True, blank=True)
+    reclamo_expira = models.DateTimeField(null=True, blank=True, db_index=True)
+
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     ultima_actualizacion = models.DateTimeField(auto_now=True)
 
@@ -89,6 +97,19 @@ class NotificacionEncolada(models.Model):
         ordering = ['fecha_programada']
         verbose_name = "Notificación Encolada"
         verbose_name_plural = "Notificaciones Encoladas"
+        constraints = [
+            # Un solo recordatorio de cada tipo por turno (sincronizar_cola depende de esto)
+            models.UniqueConstraint(fields=['turno', 'tipo'], name='notificacion_unica_por_turno_tipo'),
+        ]
+        indexes = [
+            # La consulta del procesador: estado IN (...) AND proximo_intento <= ahora
+            models.Index(fields=['estado', 'proximo_intento'], name='notificacion_estado_proximo'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.proximo_intento is None:
+            self.proximo_intento = self.fecha_programada
+        super().save(*args, **kwargs)
 
     def __str__(self):
         dest = self.turno.responsable.nombre if self.turno else "Broadcast"
@@ -9,6 +9,11 @@ from django.utils.html import strip_tags
 from django.core.mail import EmailMultiAlternatives
 from email.mime.image import MIMEImage
 import os
+import random
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.db import connections as db_connections, transaction
 from .models import ConfiguracionNotificacion, HistorialEnvio, NotificacionEncolada, AuditLogNotificaciones
 from core.models import Turno
 
@@ -19,6 +24,11 @@ class NotificationService:
         """
         Escanea los turnos próximos y genera los registros en NotificacionEncolada 
         que aún no existan.
+        Trabaja por conjuntos: calcula en memoria los (turno, tipo, fecha_programada)
+        deseados y los inserta de una vez. La restricción única (turno, tipo)
+        descarta los que otro proceso haya creado en paralelo. El número de
+        consultas no depende de la cantidad de turnos (salvo el conteo final,
+        por bloques). Devuelve cuántas notificaciones se insertaron realmente.
         """
         config = ConfiguracionNotificacion.get_solo()
         now = timezone.now()
@@ -33,42 +43,44 @@ class NotificationService:
             fecha__lte=end_date + timedelta(days=config.dias_antes + 1)
         ).exclude(
             estado__in=['cancelado', 'completado']
-        ).select_related('responsable')
+        ).filter(
+            hora__isnull=False,
+            responsable__email__isnull=False
+        ).exclude(responsable__email='')
 
-        creadas = 0
-        for turno in turnos:
-            if not turno.fecha or not turno.hora or not turno.responsable.email:
-                continue
-            
+        # Reglas activas: (tipo, anticipación, margen hacia atrás aún válido)
+        reglas = []
+        if config.activar_anticipado:
+            reglas.append(('anticipado', timedelta(days=config.dias_antes), timedelta(hours=1)))
+        if config.activar_jornada:
+            reglas.append(('jornada', timedelta(minutes=config.minutos_antes_jornada), timedelta(minutes=30)))
+        if not reglas:
+            return 0
+
+        existentes = set(
+            NotificacionEncolada.objects.filter(turno__in=turnos).values_list('turno_id', 'tipo')
+        )
+        nuevas = []
+        for turno_id, fecha, hora in turnos.values_list('id', 'fecha', 'hora'):
             try:
-                turno_dt = timezone.make_aware(datetime.combine(turno.fecha, turno.hora))
+                turno_dt = timezone.make_aware(datetime.combine(fecha, hora))
             except:
-                turno_dt = datetime.combine(turno.fecha, turno.hora)
+                turno_dt = datetime.combine(fecha, hora)
 
-            # Regla 1: Anticipado
-            if config.activar_anticipado:
-                prog = turno_dt - timedelta(days=config.dias_antes)
+            for tipo, anticipacion, margen in reglas:
+                prog = turno_dt - anticipacion
                 # Solo planificar si es futuro o muy reciente para ejecutar_vigilancia
-                if prog > (now - timedelta(hours=1)):
-                    obj, created = NotificacionEncolada.objects.get_or_create(
-                        turno=turno,
-                        tipo='anticipado',
-                        defaults={'fecha_programada': prog}
-                    )
-                    if created: creadas += 1
+                if (turno_id, tipo) not in existentes and prog > now - margen:
+                    nuevas.append(NotificacionEncolada(turno_id=turno_id, tipo=tipo, fecha_programada=prog, proximo_intento=prog))
 
-            # Regla 2: Día del Turno
-            if config.activar_jornada:
-                prog = turno_dt - timedelta(minutes=config.minutos_antes_jornada)
-                if prog > (now - timedelta(minutes=30)):
-                    obj, created = NotificacionEncolada.objects.get_or_create(
-                        turno=turno,
-                        tipo='jornada',
-                        defaults={'fecha_programada': prog}
-                    )
-                    if created: creadas += 1
-        
-        return creadas
+        # Sin batch_size: un solo INSERT donde el motor lo permite (SQLite lo parte por su límite de parámetros)
+        NotificacionEncolada.objects.bulk_create(nuevas, ignore_conflicts=True)
+        # Los UUID se generan aquí: solo existen los de las filas que no chocaron con otra
+        ids = [n.id for n in nuevas]
+        return sum(
+            NotificacionEncolada.objects.filter(id__in=ids[i:i + 500]).count()
+            for i in range(0, len(ids), 500)
+        )
     @staticmethod
     def calcular_proyeccion(dias=7, offset=0):
         """
@@ -151,172 +163,362 @@ class NotificationService:
         return proyeccion
 
     @staticmethod
-    def ejecutar_vigilancia(specific_ids=None):
+    def ejecutar_vigilancia(specific_ids=None, hilos=None):
         """
         EL PROCESADOR DE COLA.
-        Busca notificaciones en 'pendiente' o 'error_temporal'.
-        Si specific_ids es proveído, ignora la fecha_programada.
+        Busca notificaciones en 'pendiente' o 'error_temporal' cuyo
+        proximo_intento ya llegó (tras un error se espera según espera_reintento).
+        Si specific_ids es proveído, ignora la fecha_programada y la espera.
+        Los envíos se reparten entre `hilos` trabajadores (por defecto
+        settings.NOTIFICACIONES_HILOS_ENVIO, uno solo con SQLite), cada uno con
+        su propia conexión SMTP.
+        Cada trabajador reclama sus ítems con reclamar_items, así que varias
+        ejecuciones simultáneas (cron, botón del panel) no envían dos veces.
+        Antes de empezar devuelve a la cola los reclamos vencidos de
+        trabajadores que murieron (recuperar_reclamos_vencidos).
         """
-        now = timezone.now()
-        
+        NotificationService.recuperar_reclamos_vencidos()
+        inicio = timezone.now()
+
         if specific_ids:
             cola = NotificacionEncolada.objects.filter(
                 id__in=specific_ids,
                 estado__in=['pendiente', 'error_temporal', 'enviado', 'fallido', 'cancelado'] # Permitir forzar cualquiera
-            ).select_related('turno', 'turno__responsable')
+            )
         else:
             cola = NotificacionEncolada.objects.filter(
                 estado__in=['pendiente', 'error_temporal'],
-                fecha_programada__lte=now
-            ).select_related('turno', 'turno__responsable')
-        
-        enviados = 0
-        errores = 0
-        
-        if not cola.exists():
+                proximo_intento__lte=inicio
+            )
+        # Una sola pasada: lo que ya se intentó en esta ejecución no se vuelve a tomar
+        cola = cola.filter(Q(reclamado_el__isnull=True) | Q(reclamado_el__lt=inicio))
+
+        total = cola.count()
+        if not total:
             return 0, 0
 
         config = ConfiguracionNotificacion.get_solo()
-        connection = get_connection()
-        connection.open()
-        
-        # Imagen de encabezado
-        header_img_path = os.path.join(settings.BASE_DIR, 'core', 'static', 'img', 'mujeru.jpg')
-        header_img_data = None
-        if os.path.exists(header_img_path):
-            with open(header_img_path, 'rb') as f:
-                header_img_data = f.read()
-        
-        # Logo UNEMI para firma
-        logo_path = os.path.join(settings.BASE_DIR, 'unemi.png')
-        logo_data = None
-        if os.path.exists(logo_path):
-            with open(logo_path, 'rb') as f:
-                logo_data = f.read()
-        
-        for item in cola:
-            item.estado = 'procesando'
-            item.save()
-            
-            try:
-                turno = item.turno
-                if not turno or not turno.responsable or not turno.responsable.email:
-                    raise Exception("El responsable no tiene un correo electrónico configurado.")
+        imagenes = NotificationService._cargar_imagenes()
+        if not hilos:
+            hilos = getattr(settings, 'NOTIFICACIONES_HILOS_ENVIO', 1)
+            if db_connections[cola.db].vendor == 'sqlite':
+                hilos = 1
+        hilos = max(1, min(hilos, total))
 
-                if not settings.DEFAULT_FROM_EMAIL:
-                    raise Exception("El sistema no tiene configurado el correo emisor (DEFAULT_FROM_EMAIL en settings.py).")
+        if hilos == 1:
+            return NotificationService._trabajador_envio(cola, config, imagenes)
 
-                try:
-                    subject, body_text = NotificationService._preparar_contenido(item, config)
-                except Exception as e:
-                    raise e
-
-                context = {
-                    'turno': turno,
-                    'responsable': turno.responsable,
-                    'tipo_nombre': item.get_tipo_display(),
-                    'cuerpo_personalizado': body_text
-                }
-                
-                html_message = render_to_string('notifications/email_template.html', context)
-                plain_message = strip_tags(html_message)
-                
-                msg = EmailMultiAlternatives(
-                    subject,
-                    plain_message,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [turno.responsable.email],
-                    connection=connection
-                )
-                msg.attach_alternative(html_message, "text/html")
-
-                if header_img_data:
-                    h_img = MIMEImage(header_img_data)
-                    h_img.add_header('Content-ID', '<header_image>')
-                    msg.attach(h_img)
-
-                if logo_data:
-                    l_img = MIMEImage(logo_data)
-                    l_img.add_header('Content-ID', '<unemi_logo>')
-                    msg.attach(l_img)
-                
-                 # BCC de supervisión
-                if config.cc_email:
-                    try:
-                        bcc_msg = EmailMultiAlternatives(
-                            f"[BCC] {subject}",
-                            plain_message,
-                            settings.DEFAULT_FROM_EMAIL,
-                            [config.cc_email],
-                            connection=connection
-                        )
-                        bcc_msg.attach_alternative(html_message, "text/html")
-                        if header_img_data:
-                            h_img_copy = MIMEImage(header_img_data)
-                            h_img_copy.add_header('Content-ID', '<header_image>')
-                            bcc_msg.attach(h_img_copy)
-                        if logo_data:
-                            l_img_copy = MIMEImage(logo_data)
-                            l_img_copy.add_header('Content-ID', '<unemi_logo>')
-                            bcc_msg.attach(l_img_copy)
-                        bcc_msg.send()
-                    except:
-                        pass # No bloquear si el BCC falla
-
-                msg.send()
-
-                # ÉXITO
-                item.estado = 'enviado'
-                item.intentos += 1
-                item.ultimo_error = ""
-                item.save()
-                
-                # Snapshot de auditoría
-                HistorialEnvio.objects.create(
-                    notificacion=item,
-                    turno=turno,
-                    tipo=item.tipo,
-                    intento_n=item.intentos,
-                    estado='enviado',
-                    destinatario=turno.responsable.email,
-                    asunto=subject,
-                    cuerpo=body_text
-                )
-                
-                # Log de auditoría humana (para trazabilidad total)
-                from .models import AuditLogNotificaciones
-                AuditLogNotificaciones.objects.create(
-                    notificacion=item,
-                    accion="Envío Automático / Batch",
-                    detalles=f"Notificación enviada con éxito al funcionario. Intento {item.intentos}."
-                )
-                enviados += 1
-                
-            except Exception as e:
-                item.intentos += 1
-                item.ultimo_error = str(e)
-                # Decidir si agotamos intentos o reintentamos luego
-                if item.intentos >= item.max_intentos:
-                    item.estado = 'fallido'
+        with ThreadPoolExecutor(max_workers=hilos, thread_name_prefix='envio') as pool:
+            resultados = list(pool.map(
+                lambda _: NotificationService._trabajador_envio(cola, config, imagenes),
+                range(hilos)
+            ))
+        return sum(r[0] for r in resultados), sum(r[1] for r in resultados)
+
+    @staticmethod
+    def reclamar_items(cola, trabajador, limite):
+        """
+        Reclama de forma atómica hasta `limite` ítems de la consulta `cola`:
+        los pasa a 'procesando' con el id del trabajador y un vencimiento
+        (settings.NOTIFICACIONES_RECLAMO_SEGUNDOS). Ningún ítem queda en dos
+        reclamos vigentes. Devuelve los ítems reclamados, listos para enviar.
+        En PostgreSQL usa SELECT ... FOR UPDATE SKIP LOCKED; donde no existe
+        (SQLite) un UPDATE condicionado al estado actual, que el motor serializa.
+        """
+        ahora = timezone.now()
+        reclamo = {
+            'estado': 'procesando',
+            'trabajador': trabajador,
+            'reclamado_el': ahora,
+            'reclamo_expira': ahora + timedelta(seconds=getattr(settings, 'NOTIFICACIONES_RECLAMO_SEGUNDOS', 300)),
+        }
+        if db_connections[cola.db].features.has_select_for_update_skip_locked:
+            with transaction.atomic(using=cola.db):
+                ids = list(cola.order_by('proximo_intento').select_for_update(skip_locked=True).values_list('id', flat=True)[:limite])
+                NotificacionEncolada.objects.filter(id__in=ids).update(**reclamo)
+        else:
+            while True:
+                candidatos = list(cola.order_by('proximo_intento').values_list('id', flat=True)[:limite])
+                # Si otro trabajador se adelantó, la fila ya no cumple el filtro de `cola` y no se toca;
+                # si se adelantó con todas, se reintenta con las siguientes
+                if not candidatos or cola.filter(id__in=candidatos).update(**reclamo):
+                    break
+
+        # (trabajador, reclamado_el) identifica este reclamo
+        return list(
+            NotificacionEncolada.objects.filter(trabajador=trabajador, reclamado_el=ahora)
+            .select_related('turno', 'turno__responsable')
+            .order_by('proximo_intento')
+        )
+
+    @staticmethod
+    def recuperar_reclamos_vencidos():
+        """
+        Recupera los ítems que quedaron en 'procesando' porque su trabajador
+        murió a mitad del lote (reclamo_expira ya pasó). Si HistorialEnvio
+        registra un envío posterior al reclamo, el correo salió y el ítem se
+        marca 'enviado'; si no, el intento cuenta y vuelve a la cola como
+        'error_temporal' o queda 'fallido' si agotó max_intentos.
+        Los ítems 'procesando' sin vencimiento (anteriores a los reclamos) se
+        recuperan cuando llevan NOTIFICACIONES_RECLAMO_SEGUNDOS sin cambios.
+        Devuelve un dict con cuántos quedaron enviados, reencolados y fallidos.
+        """
+        ahora = timezone.now()
+        duracion = timedelta(seconds=getattr(settings, 'NOTIFICACIONES_RECLAMO_SEGUNDOS', 300))
+        vencidos = NotificacionEncolada.objects.filter(estado='procesando').filter(
+            Q(reclamo_expira__lt=ahora) |
+            Q(reclamo_expira__isnull=True, ultima_actualizacion__lt=ahora - duracion)
+        )
+        resultado = {'enviados': 0, 'reencolados': 0, 'fallidos': 0}
+
+        for item in vencidos:
+            desde = item.reclamado_el or item.ultima_actualizacion
+            ya_enviado = HistorialEnvio.objects.filter(
+                notificacion=item, estado='enviado', fecha_envio__gte=desde
+            ).exists()
+
+            if ya_enviado:
+                cambios = {'estado': 'enviado', 'intentos': item.intentos + 1, 'ultimo_error': ""}
+                clave, detalles = 'enviados', "El historial registra el envío; el trabajador murió antes de cerrarlo."
+            else:
+                error = f"Reclamo vencido: el trabajador {item.trabajador or '??'} no terminó el envío."
+                cambios = {'intentos': item.intentos + 1, 'ultimo_error': error}
+                if item.intentos + 1 >= item.max_intentos:
+                    cambios['estado'], clave = 'fallido', 'fallidos'
                 else:
-                    item.estado = 'error_temporal'
-                item.save()
-                
-                HistorialEnvio.objects.create(
-                    notificacion=item,
-                    turno=item.turno,
-                    tipo=item.tipo,
-                    intento_n=item.intentos,
-                    estado='fallido',
-                    destinatario=item.turno.responsable.email if item.turno else "??",
-                    asunto="Error en envío automático",
-                    error_log=str(e)
-                )
-                errores += 1
+                    cambios['estado'], clave = 'error_temporal', 'reencolados'
+                    cambios['proximo_intento'] = ahora + NotificationService.espera_reintento(item.intentos + 1)
+                detalles = f"{error} Estado: {cambios['estado']}."
+
+            # Condicionado al reclamo leído: si el trabajador terminó entretanto, no se toca
+            actualizados = NotificacionEncolada.objects.filter(
+                id=item.id, estado='procesando', reclamado_el=item.reclamado_el
+            ).update(reclamo_expira=None, ultima_actualizacion=ahora, **cambios)
+            if not actualizados:
+                continue
 
-        connection.close()
+            resultado[clave] += 1
+            AuditLogNotificaciones.objects.create(
+                notificacion=item,
+                accion="Recuperación de Reclamo Vencido",
+                detalles=detalles
+            )
+
+        return resultado
+
+    @staticmethod
+    def espera_reintento(intentos):
+        """
+        Espera antes del siguiente intento tras `intentos` fallidos: se duplica
+        desde NOTIFICACIONES_REINTENTO_BASE_SEGUNDOS hasta el tope
+        NOTIFICACIONES_REINTENTO_MAX_SEGUNDOS. La mitad de la espera es
+        aleatoria para que los ítems que fallaron juntos (p. ej. durante una
+        caída del SMTP) no vuelvan a intentarse todos a la vez.
+        """
+        base = getattr(settings, 'NOTIFICACIONES_REINTENTO_BASE_SEGUNDOS', 60)
+        tope = getattr(settings, 'NOTIFICACIONES_REINTENTO_MAX_SEGUNDOS', 3600)
+        espera = min(tope, base * 2 ** max(intentos - 1, 0))
+        return timedelta(seconds=espera / 2 + random.uniform(0, espera / 2))
+
+    @staticmethod
+    def _id_trabajador():
+        return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+    @staticmethod
+    def _cargar_imagenes():
+        """Imagen de encabezado y logo de la firma (None si no existen)."""
+        rutas = [
+            os.path.join(settings.BASE_DIR, 'core', 'static', 'img', 'mujeru.jpg'),
+            os.path.join(settings.BASE_DIR, 'unemi.png'),  # Logo UNEMI para firma
+        ]
+        imagenes = []
+        for ruta in rutas:
+            datos = None
+            if os.path.exists(ruta):
+                with open(ruta, 'rb') as f:
+                    datos = f.read()
+            imagenes.append(datos)
+        return tuple(imagenes)
+
+    @staticmethod
+    def _trabajador_envio(cola, config, imagenes):
+        """
+        Un trabajador del pool: abre su conexión SMTP y reclama ítems de `cola`
+        por lotes (settings.NOTIFICACIONES_LOTE_RECLAMO) hasta que no quede
+        ninguno disponible. Devuelve (enviados, errores).
+        """
+        enviados = 0
+        errores = 0
+        trabajador = NotificationService._id_trabajador()
+        lote = getattr(settings, 'NOTIFICACIONES_LOTE_RECLAMO', 5)
+        smtp = get_connection()
+        smtp.open()
+        try:
+            while True:
+                items = NotificationService.reclamar_items(cola, trabajador, lote)
+                if not items:
+                    break
+                for item in items:
+                    resultado = NotificationService._enviar_item(item, config, smtp, imagenes)
+                    if resultado:
+                        enviados += 1
+                    elif resultado is False:
+                        errores += 1
+        finally:
+            smtp.close()
+            # Cada hilo usa su propia conexión a la BD: se cierra al terminar
+            if threading.current_thread() is not threading.main_thread():
+                db_connections.close_all()
         return enviados, errores
 
+    @staticmethod
+    def _enviar_item(item, config, smtp, imagenes):
+        """
+        Envía un ítem de la cola por la conexión `smtp` y registra el resultado
+        (estado del ítem, HistorialEnvio y auditoría). Devuelve True si se envió,
+        False si falló y None si el reclamo venció antes de enviarlo.
+        """
+        header_img_data, logo_data = imagenes
+        # El ítem llega reclamado (estado 'procesando'). Si el reclamo venció mientras
+        # esperaba en el lote, otro trabajador puede tenerlo: no se envía
+        if item.reclamo_expira and item.reclamo_expira <= timezone.now():
+            return None
+
+        try:
+            turno = item.turno
+            if not turno or not turno.responsable or not turno.responsable.email:
+                raise Exception("El responsable no tiene un correo electrónico configurado.")
+
+            if not settings.DEFAULT_FROM_EMAIL:
+                raise Exception("El sistema no tiene configurado el correo emisor (DEFAULT_FROM_EMAIL en settings.py).")
+
+            try:
+                subject, body_text = NotificationService._preparar_contenido(item, config)
+            except Exception as e:
+                raise e
+
+            context = {
+                'turno': turno,
+                'responsable': turno.responsable,
+                'tipo_nombre': item.get_tipo_display(),
+                'cuerpo_personalizado': body_text
+            }
+            
+            html_message = render_to_string('notifications/email_template.html', context)
+            plain_message = strip_tags(html_message)
+            
+            msg = EmailMultiAlternatives(
+                subject,
+                plain_message,
+                settings.DEFAULT_FROM_EMAIL,
+                [turno.responsable.email],
+                connection=smtp
+            )
+            msg.attach_alternative(html_message, "text/html")
+
+            if header_img_data:
+                h_img = MIMEImage(header_img_data)
+                h_img.add_header('Content-ID', '<header_image>')
+                msg.attach(h_img)
+
+            if logo_data:
+                l_img = MIMEImage(logo_data)
+                l_img.add_header('Content-ID', '<unemi_logo>')
+                msg.attach(l_img)
+            
+             # BCC de supervisión
+            if config.cc_email:
+                try:
+                    bcc_msg = EmailMultiAlternatives(
+                        f"[BCC] {subject}",
+                        plain_message,
+                        settings.DEFAULT_FROM_EMAIL,
+                        [config.cc_email],
+                        connection=smtp
+                    )
+                    bcc_msg.attach_alternative(html_message, "text/html")
+                    if header_img_data:
+                        h_img_copy = MIMEImage(header_img_data)
+                        h_img_copy.add_header('Content-ID', '<header_image>')
+                        bcc_msg.attach(h_img_copy)
+                    if logo_data:
+                        l_img_copy = MIMEImage(logo_data)
+                        l_img_copy.add_header('Content-ID', '<unemi_logo>')
+                        bcc_msg.attach(l_img_copy)
+                    bcc_msg.send()
+                except:
+                    pass # No bloquear si el BCC falla
+
+            msg.send()
+
+            # Snapshot de auditoría, antes de cerrar el ítem: si el trabajador
+            # muere aquí, recuperar_reclamos_vencidos sabe que el correo salió
+            HistorialEnvio.objects.create(
+                notificacion=item,
+                turno=turno,
+                tipo=item.tipo,
+                intento_n=item.intentos + 1,
+                estado='enviado',
+                destinatario=turno.responsable.email,
+                asunto=subject,
+                cuerpo=body_text
+            )
+
+            # ÉXITO
+            item.estado = 'enviado'
+            item.intentos += 1
+            item.ultimo_error = ""
+            # Al cerrar se comprueba el reclamo: si otro trabajador lo tomó, no se pisa su estado
+            if not NotificationService._cerrar_reclamo(item, ['estado', 'intentos', 'ultimo_error']):
+                return True
+
+            # Log de auditoría humana (para trazabilidad total)
+            from .models import AuditLogNotificaciones
+            AuditLogNotificaciones.objects.create(
+                notificacion=item,
+                accion="Envío Automático / Batch",
+                detalles=f"Notificación enviada con éxito al funcionario. Intento {item.intentos}."
+            )
+            return True
+            
+        except Exception as e:
+            item.intentos += 1
+            item.ultimo_error = str(e)
+            # Decidir si agotamos intentos o reintentamos luego
+            if item.intentos >= item.max_intentos:
+                item.estado = 'fallido'
+            else:
+                item.estado = 'error_temporal'
+                item.proximo_intento = timezone.now() + NotificationService.espera_reintento(item.intentos)
+            NotificationService._cerrar_reclamo(item, ['estado', 'intentos', 'ultimo_error', 'proximo_intento'])
+            
+            HistorialEnvio.objects.create(
+                notificacion=item,
+                turno=item.turno,
+                tipo=item.tipo,
+                intento_n=item.intentos,
+                estado='fallido',
+                destinatario=(item.turno.responsable.email if item.turno else None) or "??",
+                asunto="Error en envío automático",
+                error_log=str(e)
+            )
+            return False
+
+
+    @staticmethod
+    def _cerrar_reclamo(item, campos):
+        """
+        Guarda `campos` del ítem y libera su reclamo, solo si el reclamo sigue
+        siendo el de este trabajador. Si venció y otro lo recuperó o reclamó
+        (recuperar_reclamos_vencidos), no se pisa su estado: devuelve False.
+        """
+        actualizados = NotificacionEncolada.objects.filter(
+            pk=item.pk, estado='procesando', trabajador=item.trabajador, reclamado_el=item.reclamado_el
+        ).update(
+            reclamo_expira=None, ultima_actualizacion=timezone.now(),
+            **{campo: getattr(item, campo) for campo in campos}
+        )
+        return bool(actualizados)
 
     @staticmethod
     def reenviar_individual(cola_id):
@@ -192,6 +192,7 @@ def generar_desde_proyeccion(request):
                     obj.estado = 'pendiente'
                     obj.intentos = 0
                     obj.fecha_programada = prog
+                    obj.proximo_intento = prog
                     obj.save()
                     print(f"DEBUG: Reactivado item existente ID {obj.id}")
                 else:
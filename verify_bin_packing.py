@@ -0,0 +1,102 @@
+import os
+import random
+import sys
+import django
+from collections import defaultdict
+from datetime import date, datetime, time
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gestion_activos.settings')
+django.setup()
+
+from core.models import ConfiguracionCronograma
+from core.services import (
+    capacidad_slots, iterar_slots, empaquetar_turnos, tamanos_turnos, segmentos_diarios,
+)
+
+MINUTOS_POR_EQUIPO = 15
+DURACION_FIJA = 60
+FERIADOS = [date(2026, 2, 16), date(2026, 2, 17), date(2026, 4, 3)]
+
+
+def inventario_sintetico(n, semilla=42):
+    """Muchos responsables con 1-2 equipos y unos pocos con 10-15, como en los Excel reales."""
+    rng = random.Random(semilla)
+    return [rng.choice([1, 1, 1, 1, 2, 2, 3, 4, 6, 10, 15]) for _ in range(n)]
+
+
+def configuracion(duracion, modo_duracion):
+    return ConfiguracionCronograma(
+        fecha_inicio=date(2026, 1, 5), fecha_fin=date(2026, 12, 31),
+        hora_inicio=time(8, 0), hora_fin=time(17, 0),
+        hora_almuerzo=time(12, 0), duracion_almuerzo=60,
+        duracion_turno=duracion, modo_exclusion='weekends',
+        estaciones=2, modo_duracion=modo_duracion
+    )
+
+
+def ociosidad(config, ubicaciones, trabajo):
+    """
+    Minutos de banco ociosos dentro de los días usados (capacidad de esos
+    días menos el trabajo que cabe en lo reservado) y minutos de trabajo que
+    exceden el turno reservado.
+    """
+    dias_usados = len({fecha for fecha, _, _ in ubicaciones})
+    minutos_dia = sum(n for _, n in segmentos_diarios(config)) * config.duracion_turno * config.estaciones
+    reservado = [config.duracion_turno * k for k in tamanos_turnos(config, [w // MINUTOS_POR_EQUIPO for w in trabajo])]
+    util = sum(min(w, r) for w, r in zip(trabajo, reservado))
+    excedido = sum(max(w - r, 0) for w, r in zip(trabajo, reservado))
+    return dias_usados, dias_usados * minutos_dia - util, excedido
+
+
+def sin_solapamientos(config, tamanos, ubicaciones):
+    ocupado = defaultdict(list)
+    for k, (fecha, hora, estacion) in zip(tamanos, ubicaciones):
+        inicio = hora.hour * 60 + hora.minute
+        ocupado[(fecha, estacion)].append((inicio, inicio + k * config.duracion_turno))
+    for tramos in ocupado.values():
+        tramos.sort()
+        if any(a[1] > b[0] for a, b in zip(tramos, tramos[1:])):
+            return False
+    return True
+
+
+def test_idle_time_recovered():
+    print("TEST: Idle bench time, fixed slots vs. workload-weighted bin packing")
+    equipos = inventario_sintetico(400)
+    trabajo = [n * MINUTOS_POR_EQUIPO for n in equipos]
+
+    # Asignación actual: un turno fijo de DURACION_FIJA minutos por responsable
+    fija = configuracion(DURACION_FIJA, 'fijo')
+    ubic_fija = [slot for _, slot in zip(equipos, iterar_slots(fija, FERIADOS))]
+    dias_f, ocio_f, exceso_f = ociosidad(fija, ubic_fija, trabajo)
+
+    # Nueva asignación: slots de MINUTOS_POR_EQUIPO, un slot por equipo, empaquetados por día
+    ponderada = configuracion(MINUTOS_POR_EQUIPO, 'por_equipo')
+    tamanos = tamanos_turnos(ponderada, equipos)
+    assert sum(tamanos) <= capacidad_slots(ponderada, FERIADOS)[0]
+    inicio = datetime.now()
+    ubic_ponderada = empaquetar_turnos(ponderada, tamanos, FERIADOS)
+    ms = (datetime.now() - inicio).total_seconds() * 1000
+    dias_p, ocio_p, exceso_p = ociosidad(ponderada, ubic_ponderada, trabajo)
+
+    print(f"  - Responsables: {len(equipos)}, equipos: {sum(equipos)}, empaquetado en {ms:.1f} ms")
+    print(f"  - Fijo ({DURACION_FIJA} min):      {dias_f} días, {ocio_f} min ociosos, {exceso_f} min excedidos")
+    print(f"  - Por equipo ({MINUTOS_POR_EQUIPO} min): {dias_p} días, {ocio_p} min ociosos, {exceso_p} min excedidos")
+
+    if None in ubic_ponderada:
+        print("  - FAILURE: Some turnos were not placed.")
+    elif not sin_solapamientos(ponderada, tamanos, ubic_ponderada):
+        print("  - FAILURE: Overlapping turnos on the same station.")
+    elif ocio_p < ocio_f and exceso_p <= exceso_f:
+        print(f"  - SUCCESS: Recovered {ocio_f - ocio_p} idle minutes ({(ocio_f - ocio_p) / ocio_f:.0%}) without overrunning turnos.")
+        return True
+    else:
+        print("  - FAILURE: Bin packing did not reduce idle time.")
+    return False
+
+
+if __name__ == "__main__":
+    # Código de salida distinto de cero si la verificación falla (para CI o scripts)
+    if not test_idle_time_recovered():
+        sys.exit(1)